@@ -33,7 +33,10 @@ from donkit_ragops.schemas.agent_schemas import AgentSettings
 from donkit_ragops.setup_wizard import run_setup_if_needed
 from donkit_ragops.ui import get_ui
 from donkit_ragops.ui.styles import StyleName, styled_text
-from donkit_ragops.version_checker import check_for_updates, print_update_notification
+from donkit_ragops.version_checker import (
+    check_for_updates_in_background,
+    print_update_notification,
+)
 
 app = typer.Typer(
     pretty_exceptions_enable=False,
@@ -55,9 +58,13 @@ DEFAULT_MODELS = {
 
 
 def _check_and_notify_updates() -> None:
-    """Check for available updates and notify user if newer version exists."""
+    """Notify user if a newer version exists, without waiting on PyPI.
+
+    A stale cache is refreshed in the background and the notification is
+    shown on the next start.
+    """
     try:
-        version_info = check_for_updates(__version__)
+        version_info = check_for_updates_in_background(__version__)
         if version_info:
             print_update_notification(version_info)
     except Exception:
@@ -139,7 +146,7 @@ def main(
     except Exception:
         pass
 
-    # Check for updates (async, non-blocking)
+    # Check for updates (non-blocking, PyPI is queried on a background thread)
     if ctx.invoked_subcommand is None:
         _check_and_notify_updates()
 
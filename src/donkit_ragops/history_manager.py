@@ -5,60 +5,201 @@ Follows Single Responsibility Principle - handles only history-related operation
 
 from __future__ import annotations
 
+import hashlib
+import os
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import cache
+
 from donkit.llm import GenerateRequest, LLMModelAbstract, Message
 from loguru import logger
 
 HISTORY_TOKEN_THRESHOLD = 150_000  # Compress when estimated tokens exceed this
 HISTORY_KEEP_RECENT_TURNS = 1  # Keep last N complete conversation turns after compression
+PER_MESSAGE_OVERHEAD = 4  # Estimated tokens per message for role and formatting
 EMERGENCY_MSG_MAX_CHARS = 4_000  # Max chars per message during emergency truncation
+# Head/tail slice bounds for emergency truncation (60% start, 40% end minus notice room)
+_EMERGENCY_KEEP_START = int(EMERGENCY_MSG_MAX_CHARS * 0.6)
+_EMERGENCY_KEEP_END = EMERGENCY_MSG_MAX_CHARS - _EMERGENCY_KEEP_START - 100
 # How many recent tool-call pairs (assistant+tool) to keep when compressing within a turn
 KEEP_RECENT_TOOL_PAIRS = 3
 TOOL_RESULT_SUMMARY_CHARS = 500  # Max chars to keep from old tool results when summarizing
+# Tool-call arguments (JSON) are estimated from their length instead of being tokenized;
+# 2 chars per token over-counts typical JSON, so the estimate errs towards compressing
+TOOL_ARGS_CHARS_PER_TOKEN = 2
 FALLBACK_TRUNCATION_NOTICE = (
     "[CONVERSATION HISTORY TRUNCATED]\n"
     "Previous conversation context was too large to summarize. "
     "Key context may have been lost. The most recent interaction is preserved below.\n"
     "[END TRUNCATION NOTICE]"
 )
+# Integer role codes, computed once per compression pass so hot loops compare small ints
+_R_USER, _R_ASSISTANT, _R_TOOL, _R_SYSTEM, _R_OTHER = range(5)
+_ROLE_CODES = {"user": _R_USER, "assistant": _R_ASSISTANT, "tool": _R_TOOL, "system": _R_SYSTEM}
 HISTORY_SUMMARY_PROMPT = """Summarize this conversation concisely.
 Preserve ALL key information: file paths, project names, configurations, decisions, errors.
 Format as bullet points. Be brief but complete."""
-# Module-level cache for tiktoken encoding
-_tiktoken_encoding = None
-_tiktoken_loaded = False
+# Token counts of long strings memoized by content hash, so history that is re-checked
+# every turn is only tokenized once. Shorter strings are cheaper to encode than to hash.
+_TOKEN_MEMO_MIN_CHARS = 256
+_TOKEN_MEMO_MAX_ENTRIES = 4096
+_token_count_memo: OrderedDict[bytes, int] = OrderedDict()
 
 
+@cache
 def _get_tiktoken_encoding():
-    """Lazy-load tiktoken encoding with caching."""
-    global _tiktoken_encoding, _tiktoken_loaded
-    if _tiktoken_loaded:
-        return _tiktoken_encoding
-    _tiktoken_loaded = True
+    """Lazy-load tiktoken encoding once per process (None if unavailable)."""
     try:
         import tiktoken
 
-        _tiktoken_encoding = tiktoken.get_encoding("cl100k_base")
+        return tiktoken.get_encoding("cl100k_base")
     except ImportError:
         logger.debug("tiktoken not available, using fallback token estimation")
     except Exception as e:
         logger.warning(f"Failed to load tiktoken encoding: {e}")
-    return _tiktoken_encoding
+    return None
+
+
+def _utf8_len(text: str) -> int:
+    """UTF-8 byte length of text without encoding ASCII strings (O(1) for those)."""
+    return len(text) if text.isascii() else len(text.encode("utf-8", "surrogatepass"))
+
+
+def _encode_len(encoding, text: str) -> int:
+    """Tokenize text with encoding, falling back to ~4 chars per token on error."""
+    try:
+        return len(encoding.encode_ordinary(text))
+    except Exception:
+        return _utf8_len(text) // 4
 
 
-def _count_text_tokens(text: str) -> int:
-    """Count tokens in a text string using tiktoken or fallback."""
-    if not text:
-        return 0
+def _count_texts_tokens(texts: list[str]) -> list[int]:
+    """Count tokens of each text, encoding all memo misses in one batch.
+
+    tiktoken's batch encoder releases the GIL and spreads the work over a
+    thread pool, so histories with several large messages tokenize in parallel.
+
+    Args:
+        texts: Strings to count
+
+    Returns:
+        Token count per text, in input order
+    """
     encoding = _get_tiktoken_encoding()
-    if encoding:
-        try:
-            return len(encoding.encode(text))
-        except Exception:
-            pass
-    return len(text) // 4
+    if not encoding:
+        return [_utf8_len(text) // 4 for text in texts]
+
+    counts = [0] * len(texts)
+    pending: list[tuple[int, bytes | None]] = []
+    pending_texts: list[str] = []
+    for i, text in enumerate(texts):
+        if not text:
+            continue
+        key = None
+        if len(text) >= _TOKEN_MEMO_MIN_CHARS:
+            key = hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+            count = _token_count_memo.get(key)
+            if count is not None:
+                _token_count_memo.move_to_end(key)
+                counts[i] = count
+                continue
+        pending.append((i, key))
+        pending_texts.append(text)
+
+    if not pending_texts:
+        return counts
+    try:
+        encoded = encoding.encode_ordinary_batch(pending_texts, num_threads=os.cpu_count() or 1)
+        pending_counts = [len(tokens) for tokens in encoded]
+    except Exception:
+        pending_counts = [_encode_len(encoding, text) for text in pending_texts]
+
+    for (i, key), count in zip(pending, pending_counts):
+        counts[i] = count
+        if key is not None:
+            _token_count_memo[key] = count
+            if len(_token_count_memo) > _TOKEN_MEMO_MAX_ENTRIES:
+                _token_count_memo.popitem(last=False)
+    return counts
+
+
+def _fast_message(role: str, content: str) -> Message:
+    """Build an internal text-only Message without running pydantic validation.
+
+    Only for messages assembled here from trusted strings (summaries, notices).
+    """
+    return Message.model_construct(role=role, content=content)
+
+
+@dataclass(slots=True)
+class _MessageFields:
+    """Token-relevant fields of a message list, gathered column-wise in one pass.
+
+    Attributes:
+        strings: Every token-bearing string, in message order
+        counts: counts[i] is the number of entries in strings from messages[i]
+        argument_tokens: Length-based estimate of the excluded tool-call
+            arguments of each message (0 when arguments are in strings)
+        roles: One _ROLE_CODES byte per message
+    """
+
+    strings: list[str]
+    counts: list[int]
+    argument_tokens: list[int]
+    roles: bytes
+
 
+def _extract_countable_strings(
+    messages: list[Message], include_arguments: bool = True
+) -> _MessageFields:
+    """Collect every token-bearing string and role from messages in a single pass.
 
-def _estimate_token_count(messages: list[Message]) -> int:
+    Covers message content (str or list[ContentPart]), tool_calls
+    (function name + arguments) and tool_call_id.
+
+    Args:
+        messages: List of conversation messages
+        include_arguments: Whether to include tool-call arguments in strings;
+            when False they are estimated from their length instead
+
+    Returns:
+        _MessageFields with one entry per message in every per-message column
+    """
+    strings: list[str] = []
+    counts: list[int] = []
+    argument_tokens: list[int] = []
+    roles = bytearray()
+    append = strings.append
+    role_codes = _ROLE_CODES
+    for message in messages:
+        roles.append(role_codes.get(message.role, _R_OTHER))
+        start = len(strings)
+        argument_chars = 0
+        content = message.content
+        if isinstance(content, str):
+            append(content)
+        elif isinstance(content, list):
+            for part in content:
+                part_content = getattr(part, "content", None)
+                if isinstance(part_content, str):
+                    append(part_content)
+
+        if message.tool_calls:
+            for tool_call in message.tool_calls:
+                append(tool_call.function.name)
+                if include_arguments:
+                    append(tool_call.function.arguments)
+                else:
+                    argument_chars += len(tool_call.function.arguments or "")
+
+        if message.tool_call_id:
+            append(message.tool_call_id)
+        counts.append(len(strings) - start)
+        argument_tokens.append(argument_chars // TOOL_ARGS_CHARS_PER_TOKEN)
+    return _MessageFields(strings, counts, argument_tokens, bytes(roles))
+
+
+def _estimate_token_count(messages: list[Message], precise: bool = False) -> int:
     """Estimate total token count across all messages.
 
     Counts tokens from message content (str or list[ContentPart]),
@@ -66,37 +207,97 @@ def _estimate_token_count(messages: list[Message]) -> int:
 
     Args:
         messages: List of conversation messages
+        precise: Tokenize tool-call arguments instead of estimating them
+            from their length (see TOOL_ARGS_CHARS_PER_TOKEN)
 
     Returns:
         Estimated token count
     """
+    fields = _extract_countable_strings(messages, precise)
+    strings = fields.strings
+    total = PER_MESSAGE_OVERHEAD * len(messages) + sum(fields.argument_tokens)
+    if _get_tiktoken_encoding() is None:
+        # Fallback: ~4 UTF-8 bytes per token, summed in a single C-level pass
+        return total + sum(map(_utf8_len, strings)) // 4
+    return total + sum(_count_texts_tokens(strings))
+
+
+def _message_token_counts(
+    messages: list[Message], precise: bool = False, fields: _MessageFields | None = None
+) -> list[int]:
+    """Estimate the token count of each message individually.
+
+    Args:
+        messages: List of conversation messages
+        precise: Tokenize tool-call arguments instead of estimating them
+        fields: Precomputed _extract_countable_strings(messages, precise), if available
+
+    Returns:
+        Per-message token estimates (overhead included), in message order
+    """
+    if fields is None:
+        fields = _extract_countable_strings(messages, precise)
+    strings, counts, argument_tokens = fields.strings, fields.counts, fields.argument_tokens
+    fallback = _get_tiktoken_encoding() is None
+    string_tokens = [] if fallback else _count_texts_tokens(strings)
+    result: list[int] = []
+    pos = 0
+    for n, message_argument_tokens in zip(counts, argument_tokens):
+        if fallback:
+            tokens = sum(map(_utf8_len, strings[pos : pos + n])) // 4
+        else:
+            tokens = sum(string_tokens[pos : pos + n])
+        pos += n
+        result.append(PER_MESSAGE_OVERHEAD + message_argument_tokens + tokens)
+    return result
+
+
+def _estimate_with_known_counts(messages: list[Message], known_counts: dict[int, int]) -> int:
+    """Estimate total tokens, reusing counts of messages that were already measured.
+
+    Args:
+        messages: List of conversation messages
+        known_counts: Token counts keyed by id() of already measured messages
+            (the caller must keep those messages alive)
+
+    Returns:
+        Estimated token count; only messages missing from known_counts are tokenized
+    """
     total = 0
+    unknown: list[Message] = []
     for message in messages:
-        # Per-message overhead (role, formatting tokens)
-        total += 4
-
-        # Content tokens
-        if isinstance(message.content, str):
-            total += _count_text_tokens(message.content)
-        elif isinstance(message.content, list):
-            for part in message.content:
-                if hasattr(part, "content") and isinstance(part.content, str):
-                    total += _count_text_tokens(part.content)
-
-        # Tool call tokens
-        if message.tool_calls:
-            for tool_call in message.tool_calls:
-                total += _count_text_tokens(tool_call.function.name)
-                total += _count_text_tokens(tool_call.function.arguments)
+        count = known_counts.get(id(message))
+        if count is None:
+            unknown.append(message)
+        else:
+            total += count
+    return total + _estimate_token_count(unknown)
 
-        # tool_call_id
-        if message.tool_call_id:
-            total += _count_text_tokens(message.tool_call_id)
 
-    return total
+def _token_upper_bound(messages: list[Message], fields: _MessageFields | None = None) -> int:
+    """Cheap upper bound on _estimate_token_count without running the tokenizer.
+
+    Every BPE token spans at least one UTF-8 byte, so the byte length bounds the
+    token count. The bytes // 4 fallback estimate is always below this bound as well.
+    A fixed tokens-per-char ratio is not safe here: single-character words such as
+    "x x x" already tokenize at about one token per two characters.
 
+    fields may carry precomputed _extract_countable_strings(messages, False).
+    """
+    if fields is None:
+        fields = _extract_countable_strings(messages, include_arguments=False)
+    total = PER_MESSAGE_OVERHEAD * len(messages) + sum(fields.argument_tokens)
+    return total + sum(map(_utf8_len, fields.strings))
+
+
+def _role_codes(messages: list[Message]) -> bytes:
+    """Encode message roles as one byte per message (see _ROLE_CODES)."""
+    return bytes([_ROLE_CODES.get(m.role, _R_OTHER) for m in messages])
 
-def _find_recent_complete_turns(messages: list[Message], num_turns: int) -> list[Message]:
+
+def _find_recent_complete_turns(
+    messages: list[Message], num_turns: int, roles: bytes | None = None
+) -> list[Message]:
     """Find the last N complete conversation turns.
 
     A turn starts with a user message and includes all subsequent messages
@@ -105,6 +306,7 @@ def _find_recent_complete_turns(messages: list[Message], num_turns: int) -> list
     Args:
         messages: List of conversation messages (no system messages)
         num_turns: Number of complete turns to keep
+        roles: Precomputed _role_codes(messages), if available
 
     Returns:
         List of messages for the last N complete turns
@@ -112,18 +314,25 @@ def _find_recent_complete_turns(messages: list[Message], num_turns: int) -> list
     if not messages:
         return []
 
-    # Find indices where user messages start (beginning of turns)
-    user_indices = [i for i, m in enumerate(messages) if m.role == "user"]
+    if roles is None:
+        roles = _role_codes(messages)
 
-    if not user_indices:
+    # Turns begin at user messages — walk back from the end with C-level rfind
+    start_idx = roles.rfind(_R_USER)
+    if start_idx == -1:
         # No user messages - keep all
         return messages
 
-    # Calculate how many turns to keep
-    turns_to_keep = min(num_turns, len(user_indices))
+    if num_turns <= 0:
+        # Keep everything from the first user message
+        return messages[roles.find(_R_USER) :]
 
-    # Start index is where the (last - turns_to_keep)th user message begins
-    start_idx = user_indices[-turns_to_keep]
+    # Step back to the (last - num_turns)th user message, or the first one available
+    for _ in range(num_turns - 1):
+        prev_idx = roles.rfind(_R_USER, 0, start_idx)
+        if prev_idx == -1:
+            break
+        start_idx = prev_idx
 
     return messages[start_idx:]
 
@@ -131,6 +340,7 @@ def _find_recent_complete_turns(messages: list[Message], num_turns: int) -> list
 def _compress_tool_calls_in_turn(
     msgs_to_keep: list[Message],
     num_recent_pairs: int = KEEP_RECENT_TOOL_PAIRS,
+    roles: bytes | None = None,
 ) -> list[Message]:
     """Compress old tool call results within a single turn.
 
@@ -143,75 +353,74 @@ def _compress_tool_calls_in_turn(
     A "tool-call pair" is:
       - assistant message with tool_calls (no text content)
       - one or more tool result messages that follow it
+
+    roles may carry precomputed _role_codes(msgs_to_keep) to avoid re-encoding.
     """
     if not msgs_to_keep:
         return msgs_to_keep
 
+    # Early exit: every pair but the first starts with an assistant tool call, so
+    # fewer tool-call messages than num_recent_pairs means nothing to compress
+    tool_call_msgs = 0
+    for msg in msgs_to_keep:
+        if msg.tool_calls:
+            tool_call_msgs += 1
+            if tool_call_msgs >= num_recent_pairs:
+                break
+    else:
+        return msgs_to_keep
+
+    if roles is None:
+        roles = _role_codes(msgs_to_keep)
+
     # Split: leading user message(s) vs tool-call sequence
     # The turn typically starts with a user message, then alternating
     # assistant(tool_calls) + tool messages.
-    leading: list[Message] = []
-    tool_sequence: list[Message] = []
-    found_tool_call = False
-
-    for msg in msgs_to_keep:
-        if not found_tool_call and msg.role in ("user", "assistant") and not msg.tool_calls:
-            leading.append(msg)
-        else:
-            found_tool_call = True
-            tool_sequence.append(msg)
-
-    if not tool_sequence:
+    total = len(msgs_to_keep)
+    seq_start = total
+    for i, msg in enumerate(msgs_to_keep):
+        if roles[i] not in (_R_USER, _R_ASSISTANT) or msg.tool_calls:
+            seq_start = i
+            break
+
+    if seq_start == total:
         return msgs_to_keep
 
-    # Group tool_sequence into pairs: (assistant-with-tool_calls, [tool results...])
-    pairs: list[list[Message]] = []
-    current_pair: list[Message] = []
-    for msg in tool_sequence:
-        if msg.role == "assistant" and msg.tool_calls and current_pair:
-            # Start of a new pair — save previous
-            pairs.append(current_pair)
-            current_pair = [msg]
-        else:
-            current_pair.append(msg)
-
-    if current_pair:
-        pairs.append(current_pair)
+    # Pair boundaries: the sequence head plus every later assistant-with-tool_calls
+    pair_starts = [seq_start]
+    for i in range(seq_start + 1, total):
+        if roles[i] == _R_ASSISTANT and msgs_to_keep[i].tool_calls:
+            pair_starts.append(i)
 
-    if len(pairs) <= num_recent_pairs:
+    if len(pair_starts) <= num_recent_pairs:
         # Not enough pairs to compress
         return msgs_to_keep
 
-    # Split into old pairs (to summarise) and recent pairs (to keep)
-    old_pairs = pairs[:-num_recent_pairs]
-    recent_pairs = pairs[-num_recent_pairs:]
+    # Old pairs (to summarise) end where the first recent pair (to keep) begins
+    recent_start = pair_starts[-num_recent_pairs]
 
     # Build a compact summary of old tool calls
     summaries: list[str] = []
-    for pair in old_pairs:
-        for msg in pair:
-            if msg.role == "assistant" and msg.tool_calls:
-                for tc in msg.tool_calls:
-                    summaries.append(f"- Called {tc.function.name}")
-
-            elif msg.role == "tool":
-                # Keep first 200 chars of each result as a hint
-                preview = (msg.content or "")[:200]
-                if len(msg.content or "") > 200:
-                    preview += "..."
-                tool_name = msg.name or "tool"
-                summaries.append(f"  {tool_name} result: {preview}")
+    for msg, role in zip(msgs_to_keep[seq_start:recent_start], roles[seq_start:recent_start]):
+        if role == _R_ASSISTANT and msg.tool_calls:
+            summaries.extend(f"- Called {tc.function.name}" for tc in msg.tool_calls)
+
+        elif role == _R_TOOL:
+            # Keep first 200 chars of each result as a hint
+            content = msg.content or ""
+            preview = content[:200] + "..." if len(content) > 200 else content
+            tool_name = msg.name or "tool"
+            summaries.append(f"  {tool_name} result: {preview}")
 
     summary_text = (
         "[COMPRESSED TOOL HISTORY]\n" + "\n".join(summaries) + "\n[END COMPRESSED TOOL HISTORY]"
     )
 
-    # Flatten recent pairs
-    recent_msgs: list[Message] = []
-    for pair in recent_pairs:
-        recent_msgs.extend(pair)
-
-    return leading + [Message(role="assistant", content=summary_text)] + recent_msgs
+    return [
+        *msgs_to_keep[:seq_start],
+        _fast_message("assistant", summary_text),
+        *msgs_to_keep[recent_start:],
+    ]
 
 
 def _shrink_tool_results(messages: list[Message]) -> list[Message]:
@@ -236,6 +445,16 @@ def _shrink_tool_results(messages: list[Message]) -> list[Message]:
     return shrunk
 
 
+def _truncate_content(content: str, orig_len: int) -> str:
+    """Keep the head and tail of oversized content around a truncation notice."""
+    # Single f-string so the result is built in one allocation
+    return (
+        f"{content[:_EMERGENCY_KEEP_START]}"
+        f"\n\n[... truncated {orig_len} -> {EMERGENCY_MSG_MAX_CHARS} chars ...]\n\n"
+        f"{content[-_EMERGENCY_KEEP_END:]}"
+    )
+
+
 def _emergency_truncate_messages(messages: list[Message]) -> list[Message]:
     """Truncate individual message content that is excessively large.
 
@@ -243,18 +462,28 @@ def _emergency_truncate_messages(messages: list[Message]) -> list[Message]:
     Preserves message structure (roles, tool_call_ids) while truncating content.
     Keeps 60% from the start and 40% from the end of each oversized message.
     """
-    truncated = []
-    for msg in messages:
-        if isinstance(msg.content, str) and len(msg.content) > EMERGENCY_MSG_MAX_CHARS:
-            keep_start = int(EMERGENCY_MSG_MAX_CHARS * 0.6)
-            keep_end = EMERGENCY_MSG_MAX_CHARS - keep_start - 100
-            orig_len = len(msg.content)
-            notice = f"\n\n[... truncated {orig_len} -> {EMERGENCY_MSG_MAX_CHARS} chars ...]\n\n"
-            new_content = msg.content[:keep_start] + notice + msg.content[-keep_end:]
-            truncated.append(msg.model_copy(update={"content": new_content}))
-        else:
-            truncated.append(msg)
-    return truncated
+    content_lens = [len(m.content) if isinstance(m.content, str) else 0 for m in messages]
+    return [
+        msg.model_copy(update={"content": _truncate_content(msg.content, orig_len)})
+        if orig_len > EMERGENCY_MSG_MAX_CHARS
+        else msg
+        for msg, orig_len in zip(messages, content_lens)
+    ]
+
+
+def _assemble_history(
+    system_msgs: list[Message], turn: list[Message], header: Message | None = None
+) -> list[Message]:
+    """Join system messages, an optional header message and the kept turn.
+
+    Builds the result with one list copy and in-place extends instead of
+    chained concatenation.
+    """
+    history = list(system_msgs)
+    if header is not None:
+        history.append(header)
+    history.extend(turn)
+    return history
 
 
 def _log_compressed_history(history: list[Message], label: str) -> None:
@@ -278,24 +507,45 @@ async def compress_history_if_needed(
     Returns:
         Compressed history list or original if no compression needed
     """
-    estimated_tokens = _estimate_token_count(history)
+    # One pass over the messages feeds the size gate, token counts and turn split
+    fields = _extract_countable_strings(history, include_arguments=False)
+
+    # Small histories cannot exceed the threshold — skip tokenization entirely
+    if _token_upper_bound(history, fields) <= HISTORY_TOKEN_THRESHOLD:
+        return history
+
+    token_counts = _message_token_counts(history, fields=fields)
+    estimated_tokens = sum(token_counts)
     if estimated_tokens <= HISTORY_TOKEN_THRESHOLD:
         return history
 
-    # Separate system messages and conversation
-    system_msgs = [m for m in history if m.role == "system"]
-    conversation_msgs = [m for m in history if m.role != "system"]
+    # Compressed histories mostly reuse original messages — don't re-tokenize them
+    known_counts = dict(zip(map(id, history), token_counts))
 
-    # Find the start of the last N complete turns
-    # A turn starts with a user message
-    msgs_to_keep = _find_recent_complete_turns(conversation_msgs, HISTORY_KEEP_RECENT_TURNS)
-    msgs_to_summarize = conversation_msgs[: len(conversation_msgs) - len(msgs_to_keep)]
+    # Separate system messages and conversation
+    roles = fields.roles
+    system_msgs = [m for m, role in zip(history, roles) if role == _R_SYSTEM]
+    conversation_msgs = [m for m, role in zip(history, roles) if role != _R_SYSTEM]
+    conversation_roles = roles.replace(bytes([_R_SYSTEM]), b"")
+
+    if conversation_roles.find(_R_USER, 1) != -1:
+        # Find the start of the last N complete turns
+        # A turn starts with a user message
+        msgs_to_keep = _find_recent_complete_turns(
+            conversation_msgs, HISTORY_KEEP_RECENT_TURNS, conversation_roles
+        )
+        msgs_to_summarize = conversation_msgs[: len(conversation_msgs) - len(msgs_to_keep)]
+    else:
+        # Single turn (e.g. autonomous tool work) — nothing older to summarise,
+        # so skip turn discovery entirely
+        msgs_to_keep, msgs_to_summarize = conversation_msgs, []
+    keep_roles = conversation_roles[len(msgs_to_summarize) :]
 
     if not msgs_to_summarize:
         # All messages are in the current turn — compress tool calls within it
-        compressed_turn = _compress_tool_calls_in_turn(msgs_to_keep)
-        new_history = system_msgs + compressed_turn
-        new_tokens = _estimate_token_count(new_history)
+        compressed_turn = _compress_tool_calls_in_turn(msgs_to_keep, roles=keep_roles)
+        new_history = _assemble_history(system_msgs, compressed_turn)
+        new_tokens = _estimate_with_known_counts(new_history, known_counts)
         if new_tokens <= HISTORY_TOKEN_THRESHOLD:
             logger.debug(
                 f"Compressed tool calls within turn: {len(history)} -> {len(new_history)} messages "
@@ -308,7 +558,7 @@ async def compress_history_if_needed(
             f"Tool-call compression not enough ({new_tokens} > {HISTORY_TOKEN_THRESHOLD}), "
             "applying emergency truncation"
         )
-        emergency = system_msgs + _emergency_truncate_messages(compressed_turn)
+        emergency = _assemble_history(system_msgs, _emergency_truncate_messages(compressed_turn))
         _log_compressed_history(emergency, "emergency truncation (single turn)")
         return emergency
 
@@ -317,7 +567,7 @@ async def compress_history_if_needed(
     shrunk_to_summarize = _shrink_tool_results(msgs_to_summarize)
     try:
         request = GenerateRequest(
-            messages=shrunk_to_summarize + [Message(role="user", content=HISTORY_SUMMARY_PROMPT)]
+            messages=shrunk_to_summarize + [_fast_message("user", HISTORY_SUMMARY_PROMPT)]
         )
         response = await provider.generate(request)
         summary = response.content or ""
@@ -325,13 +575,14 @@ async def compress_history_if_needed(
 
         # Build new history: system + summary + recent messages
         # Also compress tool calls within the kept turn if it's large
-        compressed_keep = _compress_tool_calls_in_turn(msgs_to_keep)
-        new_history = (
-            system_msgs + [Message(role="assistant", content=summary_text)] + compressed_keep
+        compressed_keep = _compress_tool_calls_in_turn(msgs_to_keep, roles=keep_roles)
+        new_history = _assemble_history(
+            system_msgs, compressed_keep, _fast_message("assistant", summary_text)
         )
         logger.debug(
             f"Compressed history (LLM summary): {len(history)} -> {len(new_history)} messages "
-            f"(estimated tokens: {estimated_tokens} -> {_estimate_token_count(new_history)})"
+            f"(estimated tokens: {estimated_tokens} -> "
+            f"{_estimate_with_known_counts(new_history, known_counts)})"
         )
         _log_compressed_history(new_history, "LLM summary")
         return new_history
@@ -340,29 +591,25 @@ async def compress_history_if_needed(
 
     # Fallback: mechanical truncation without LLM
     # Compress tool calls within the kept turn first
-    compressed_keep = _compress_tool_calls_in_turn(msgs_to_keep)
-    new_history = (
-        system_msgs
-        + [Message(role="assistant", content=FALLBACK_TRUNCATION_NOTICE)]
-        + compressed_keep
-    )
+    compressed_keep = _compress_tool_calls_in_turn(msgs_to_keep, roles=keep_roles)
+    fallback_notice = _fast_message("assistant", FALLBACK_TRUNCATION_NOTICE)
+    new_history = _assemble_history(system_msgs, compressed_keep, fallback_notice)
 
     # If still exceeds the threshold, emergency-truncate individual messages
-    fallback_tokens = _estimate_token_count(new_history)
+    fallback_tokens = _estimate_with_known_counts(new_history, known_counts)
     if fallback_tokens > HISTORY_TOKEN_THRESHOLD:
         logger.warning(
             f"Fallback still exceeds threshold ({fallback_tokens} > {HISTORY_TOKEN_THRESHOLD}). "
             "Emergency-truncating individual messages."
         )
-        new_history = (
-            system_msgs
-            + [Message(role="assistant", content=FALLBACK_TRUNCATION_NOTICE)]
-            + _emergency_truncate_messages(compressed_keep)
+        new_history = _assemble_history(
+            system_msgs, _emergency_truncate_messages(compressed_keep), fallback_notice
         )
 
     logger.debug(
         f"Mechanical fallback compression: {len(history)} -> {len(new_history)} messages "
-        f"(estimated tokens: {estimated_tokens} -> {_estimate_token_count(new_history)})"
+        f"(estimated tokens: {estimated_tokens} -> "
+        f"{_estimate_with_known_counts(new_history, known_counts)})"
     )
     _log_compressed_history(new_history, "mechanical fallback")
     return new_history
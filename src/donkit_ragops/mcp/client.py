@@ -3,8 +3,10 @@ from __future__ import annotations
 import asyncio
 import json
 import os
+import sys
+from collections.abc import Awaitable, Callable
 from pathlib import Path
-from typing import Any
+from typing import Any, TypeVar
 
 from dotenv import dotenv_values, find_dotenv
 from fastmcp import Client
@@ -13,6 +15,16 @@ from loguru import logger
 
 from donkit_ragops.mcp.protocol import MCPClientProtocol, ProgressCallback
 
+T = TypeVar("T")
+
+# Backoff between failed attempts to reopen persistent connections (seconds)
+RECONNECT_BACKOFF_BASE = 0.5
+RECONNECT_BACKOFF_MAX = 30.0
+
+# Temporary (spawn-per-call) connections allowed at once per client and event loop.
+# Each one is a server subprocess, so batches without a pool must not start one per call.
+MAX_TEMPORARY_CONNECTIONS = 4
+
 
 def _load_env_for_mcp() -> dict[str, str | None]:
     """Load environment variables for MCP server.
@@ -64,8 +76,10 @@ class MCPClient(MCPClientProtocol):
     """Client for connecting to an MCP server using FastMCP over stdio.
 
     Supports two usage modes:
-    - Persistent: call connect() once, then reuse the subprocess across
+    - Persistent: call connect() once, then reuse the subprocess(es) across
       alist_tools()/acall_tool() calls. Call disconnect() when done.
+      With pool_size > 1, calls are spread round-robin over that many
+      server subprocesses.
     - Temporary (fallback): each call spawns its own subprocess.
       Used by sync callers and when connect() was not called.
     """
@@ -76,6 +90,7 @@ class MCPClient(MCPClientProtocol):
         args: list[str] | None = None,
         timeout: float = 999.0,
         progress_callback: ProgressCallback | None = None,
+        pool_size: int = 1,
     ) -> None:
         """Initialize MCP client.
 
@@ -84,6 +99,9 @@ class MCPClient(MCPClientProtocol):
             args: Command-line arguments including the script path
             timeout: Timeout for operations in seconds
             progress_callback: Optional callback for progress updates from MCP tools
+            pool_size: Number of persistent server subprocesses opened by connect().
+                Each one is a separate server process, so only raise it for
+                servers that keep no state between calls.
         """
         self._command = command
         self._args = args or []
@@ -91,9 +109,20 @@ class MCPClient(MCPClientProtocol):
         self._progress_callback = progress_callback
         # Load environment variables for the server
         self._env = _load_env_for_mcp()
-        # Persistent connection state (populated by connect())
-        self._transport: StdioTransport | None = None
-        self._client: Client | None = None
+        # Persistent connection pool (populated by connect())
+        self._pool_size = max(1, pool_size)
+        self._connections: list[tuple[Client, StdioTransport]] = []
+        self._next_index = 0
+        # Set by connect(): calls then keep refilling the pool after failures
+        self._persistent = False
+        # Loop-bound primitives, created lazily per event loop since sync callers
+        # run each call in asyncio.run(). The lock serializes recovery so concurrent
+        # transport failures trigger one reconnect; the semaphore caps temporary
+        # connections.
+        self._primitives_loop: asyncio.AbstractEventLoop | None = None
+        self._primitives: tuple[asyncio.Lock, asyncio.Semaphore] | None = None
+        self._reconnect_failures = 0
+        self._reconnect_not_before = 0.0
 
     @property
     def identifier(self) -> str:
@@ -110,6 +139,21 @@ class MCPClient(MCPClientProtocol):
         """Return the command arguments."""
         return self._args
 
+    @property
+    def pool_size(self) -> int:
+        """Return the number of persistent connections opened by connect()."""
+        return self._pool_size
+
+    @property
+    def _client(self) -> Client | None:
+        """Return the first persistent client, or None when not connected."""
+        return self._connections[0][0] if self._connections else None
+
+    @property
+    def _transport(self) -> StdioTransport | None:
+        """Return the first persistent transport, or None when not connected."""
+        return self._connections[0][1] if self._connections else None
+
     @property
     def timeout(self) -> float:
         """Return the timeout in seconds."""
@@ -123,50 +167,155 @@ class MCPClient(MCPClientProtocol):
     # -- Persistent connection lifecycle -----------------------------------
 
     async def connect(self) -> None:
-        """Open a persistent stdio connection for reuse across calls."""
-        if self._client is not None:
-            return  # already connected
-        transport = StdioTransport(
-            command=self.command,
-            args=self.args,
-            env=self._env,
-        )
-        client = Client(transport, progress_handler=self.__progress_handler)
-        await client.__aenter__()
-        self._transport = transport
-        self._client = client
-        logger.debug(f"Persistent MCP connection opened: {self.identifier}")
+        """Open pool_size persistent stdio connections for reuse across calls."""
+        self._persistent = True
+        while len(self._connections) < self._pool_size:
+            transport = StdioTransport(
+                command=self.command,
+                args=self.args,
+                env=self._env,
+            )
+            client = Client(transport, progress_handler=self._progress_handler)
+            await client.__aenter__()
+            self._connections.append((client, transport))
+            logger.debug(
+                f"Persistent MCP connection opened: {self.identifier} "
+                f"({len(self._connections)}/{self._pool_size})"
+            )
 
     async def disconnect(self) -> None:
-        """Close the persistent connection and terminate the subprocess."""
-        client = self._client
-        transport = self._transport
-        self._client = None
-        self._transport = None
-        if client is not None:
-            try:
-                await client.__aexit__(None, None, None)
-            except Exception as e:
-                logger.debug(f"Error closing MCP client: {e}")
-        if transport is not None:
-            await self._terminate_transport(transport)
+        """Close all persistent connections and terminate their subprocesses."""
+        self._persistent = False
+        connections = self._connections
+        self._connections = []
+        for client, transport in connections:
+            await self._close_connection(client, transport)
         logger.debug(f"Persistent MCP connection closed: {self.identifier}")
 
+    def _next_connection(self) -> tuple[Client, StdioTransport]:
+        """Pick the next persistent connection round-robin."""
+        index = self._next_index % len(self._connections)
+        self._next_index = index + 1
+        return self._connections[index]
+
+    def _loop_primitives(self) -> tuple[asyncio.Lock, asyncio.Semaphore]:
+        """Return the reconnect lock and temporary-connection semaphore for the running loop."""
+        loop = asyncio.get_running_loop()
+        if self._primitives is None or self._primitives_loop is not loop:
+            self._primitives = (asyncio.Lock(), asyncio.Semaphore(MAX_TEMPORARY_CONNECTIONS))
+            self._primitives_loop = loop
+        return self._primitives
+
+    def _get_reconnect_lock(self) -> asyncio.Lock:
+        """Return the reconnect lock for the running event loop, creating it on first use."""
+        return self._loop_primitives()[0]
+
+    def _get_temporary_slots(self) -> asyncio.Semaphore:
+        """Return the temporary-connection semaphore for the running event loop."""
+        return self._loop_primitives()[1]
+
+    async def _reconnect(self) -> None:
+        """Refill the pool unless a previous failure's backoff is still running.
+
+        Must be called with the reconnect lock held.
+        """
+        loop = asyncio.get_running_loop()
+        if loop.time() < self._reconnect_not_before:
+            return
+        try:
+            await self.connect()
+        except Exception as e:
+            self._reconnect_failures += 1
+            delay = min(
+                RECONNECT_BACKOFF_MAX,
+                RECONNECT_BACKOFF_BASE * 2 ** (self._reconnect_failures - 1),
+            )
+            self._reconnect_not_before = loop.time() + delay
+            logger.warning(f"MCP reconnect failed, retrying in {delay:.1f}s: {e}")
+        else:
+            self._reconnect_failures = 0
+
+    async def _refill_pool(self) -> None:
+        """Reopen connections lost to earlier failures once their backoff has passed."""
+        if not self._persistent or len(self._connections) >= self._pool_size:
+            return
+        if asyncio.get_running_loop().time() < self._reconnect_not_before:
+            return
+        async with self._get_reconnect_lock():
+            if self._persistent and len(self._connections) < self._pool_size:
+                await self._reconnect()
+
+    async def _recover(self, client: Client, transport: StdioTransport) -> None:
+        """Replace a failed persistent connection, reconnecting at most once at a time.
+
+        Concurrent calls that fail on the same connection wait for the first one
+        to finish; they then find the connection already gone and just retry on
+        the refreshed pool. Failed reconnects back off exponentially, and calls
+        fall back to temporary connections until a later call refills the pool.
+        """
+        async with self._get_reconnect_lock():
+            for index, (pooled_client, _) in enumerate(self._connections):
+                if pooled_client is client:
+                    del self._connections[index]
+                    break
+            else:
+                return  # already replaced by a concurrent call
+            await self._close_connection(client, transport)
+            await self._reconnect()
+
+    async def _run_pooled(self, operation: Callable[[Client], Awaitable[T]]) -> T | None:
+        """Run operation on a persistent connection, retrying once after a transport error.
+
+        The failed connection is replaced first. The retry goes to the refreshed
+        pool; if the pool is empty, None is returned and the caller retries on a
+        temporary connection instead. Either way a request is sent at most twice,
+        since tools are not necessarily idempotent.
+
+        Returns:
+            The operation's result, or None when no persistent connection is available.
+        """
+        await self._refill_pool()
+        if not self._connections:
+            return None
+        client, transport = self._next_connection()
+        try:
+            return await operation(client)
+        except self._TRANSPORT_ERRORS as e:
+            logger.warning(f"Persistent MCP connection failed, reconnecting: {e}")
+            await self._recover(client, transport)
+        if not self._connections:
+            return None
+        client, transport = self._next_connection()
+        try:
+            return await operation(client)
+        except self._TRANSPORT_ERRORS:
+            await self._recover(client, transport)
+            raise
+
+    @staticmethod
+    async def _close_connection(client: Client, transport: StdioTransport) -> None:
+        """Exit a client session and terminate its subprocess."""
+        try:
+            await client.__aexit__(None, None, None)
+        except Exception as e:
+            logger.debug(f"Error closing MCP client: {e}")
+        await MCPClient._terminate_transport(transport)
+
     # -- Progress handling -------------------------------------------------
 
-    async def __progress_handler(
+    async def _progress_handler(
         self,
         progress: float,
         total: float | None,
         message: str | None,
     ) -> None:
         """Handle progress updates from read_engine MCP server."""
-        if self.progress_callback:
-            self.progress_callback(progress, total, message)
+        # Read once per event: long tool calls can report hundreds of updates
+        callback = self._progress_callback
+        if callback is not None:
+            callback(progress, total, message)
         else:
             # Fallback: overwrite the same line using \r
-            import sys
-
             if total is not None:
                 percentage = (progress / total) * 100
                 line = f"Progress: {percentage:.1f}% - {message or ''}"
@@ -247,29 +396,27 @@ class MCPClient(MCPClientProtocol):
 
     async def alist_tools(self) -> list[dict[str, Any]]:
         """List available tools from the MCP server."""
-        # Fast path: reuse persistent connection
-        if self._client is not None:
-            try:
-                return await self._list_tools_from(self._client)
-            except self._TRANSPORT_ERRORS as e:
-                logger.warning(f"Persistent MCP connection failed, reconnecting: {e}")
-                await self.disconnect()
+        # Fast path: reuse persistent connections, replacing any that died
+        tools = await self._run_pooled(self._list_tools_from)
+        if tools is not None:
+            return tools
 
         # Fallback: temporary connection per call
-        transport = StdioTransport(
-            command=self.command,
-            args=self.args,
-            env=self._env,
-        )
-        client = Client(transport)
-        try:
-            async with client:
-                return await self._list_tools_from(client)
-        except asyncio.CancelledError:
-            logger.warning("Tool listing was cancelled")
-            raise
-        finally:
-            await self._terminate_transport(transport)
+        async with self._get_temporary_slots():
+            transport = StdioTransport(
+                command=self.command,
+                args=self.args,
+                env=self._env,
+            )
+            client = Client(transport)
+            try:
+                async with client:
+                    return await self._list_tools_from(client)
+            except asyncio.CancelledError:
+                logger.warning("Tool listing was cancelled")
+                raise
+            finally:
+                await self._terminate_transport(transport)
 
     def list_tools(self) -> list[dict[str, Any]]:
         """Synchronously list available tools."""
@@ -293,28 +440,52 @@ class MCPClient(MCPClientProtocol):
         """Call a tool on the MCP server."""
         logger.debug(f"Calling tool {name} with arguments {arguments}")
 
-        # Fast path: reuse persistent connection
-        if self._client is not None:
-            try:
-                return await self._call_tool_with(self._client, name, arguments)
-            except self._TRANSPORT_ERRORS as e:
-                logger.warning(f"Persistent MCP connection failed, reconnecting: {e}")
-                await self.disconnect()
+        # Fast path: reuse persistent connections, replacing any that died
+        result = await self._run_pooled(
+            lambda client: self._call_tool_with(client, name, arguments)
+        )
+        if result is not None:
+            return result
 
         # Fallback: temporary connection per call
-        transport = StdioTransport(command=self.command, args=self.args, env=self._env)
-        client = Client(transport, progress_handler=self.__progress_handler)
-        try:
-            async with client:
-                return await self._call_tool_with(client, name, arguments)
-        except asyncio.CancelledError:
-            logger.warning(f"Tool {name} execution was cancelled")
-            raise
-        except KeyboardInterrupt:
-            logger.warning(f"Tool {name} execution interrupted by user")
-            raise
-        finally:
-            await self._terminate_transport(transport)
+        async with self._get_temporary_slots():
+            transport = StdioTransport(command=self.command, args=self.args, env=self._env)
+            client = Client(transport, progress_handler=self._progress_handler)
+            try:
+                async with client:
+                    return await self._call_tool_with(client, name, arguments)
+            except asyncio.CancelledError:
+                logger.warning(f"Tool {name} execution was cancelled")
+                raise
+            except KeyboardInterrupt:
+                logger.warning(f"Tool {name} execution interrupted by user")
+                raise
+            finally:
+                await self._terminate_transport(transport)
+
+    async def acall_tools(self, calls: list[tuple[str, dict[str, Any]]]) -> list[str]:
+        """Call several tools concurrently.
+
+        All calls are issued at once on the persistent pool; each MCP session
+        multiplexes concurrent requests, so this holds with the default single
+        pooled connection too. Calls that fall back to temporary connections
+        start at most MAX_TEMPORARY_CONNECTIONS server subprocesses at a time.
+
+        Args:
+            calls: (name, arguments) pairs to call.
+
+        Returns:
+            Tool results in the same order as calls.
+
+        Raises:
+            ExceptionGroup: If any call fails. The remaining calls are cancelled
+                and awaited first, so none keeps running unobserved.
+        """
+        async with asyncio.TaskGroup() as group:
+            tasks = [
+                group.create_task(self.acall_tool(name, arguments)) for name, arguments in calls
+            ]
+        return [task.result() for task in tasks]
 
     def call_tool(self, name: str, arguments: dict[str, Any]) -> str:
         """Synchronously call a tool."""
@@ -6,11 +6,17 @@ executes appropriate upgrade command.
 
 from __future__ import annotations
 
+import re
 import subprocess
 import sys
+import tomllib
 from enum import Enum
+from functools import lru_cache
 from pathlib import Path
 
+UPGRADE_TIMEOUT_SECONDS = 300  # 5 minutes
+UPGRADE_OUTPUT_TAIL_BYTES = 4096  # stdout kept when reporting a result
+
 
 class InstallMethod(Enum):
     """Package installation method."""
@@ -21,32 +27,92 @@ class InstallMethod(Enum):
     UNKNOWN = "unknown"
 
 
+_PIP_UPGRADE_COMMAND = (sys.executable, "-m", "pip", "install", "--upgrade", "donkit-ragops")
+_UPGRADE_COMMANDS: dict[InstallMethod, tuple[str, ...]] = {
+    InstallMethod.PIPX: ("pipx", "upgrade", "donkit-ragops"),
+    InstallMethod.POETRY: ("poetry", "update", "donkit-ragops"),
+    InstallMethod.PIP: _PIP_UPGRADE_COMMAND,
+}
+
+# Distribution name at the start of a PEP 508 requirement string
+_REQUIREMENT_NAME = re.compile(r"[A-Za-z0-9._-]*")
+
+
+def _normalize_name(requirement: str) -> str:
+    """Return the normalized distribution name of a requirement string."""
+    name = _REQUIREMENT_NAME.match(requirement.strip()).group(0)
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def _has_ragops_dependency(dependencies: object) -> bool:
+    """Check a poetry dependency table or PEP 621 dependency list for donkit-ragops."""
+    if isinstance(dependencies, dict):
+        return any(_normalize_name(name) == "donkit-ragops" for name in dependencies)
+    if isinstance(dependencies, list):
+        return any(
+            isinstance(dep, str) and _normalize_name(dep) == "donkit-ragops" for dep in dependencies
+        )
+    return False
+
+
+@lru_cache(maxsize=8)
+def _is_ragops_poetry_project(pyproject_path: str, mtime_ns: int, size: int) -> bool:
+    """Check whether a pyproject.toml is a poetry project depending on donkit-ragops.
+
+    Cached per file path, modification time and size, so an unchanged file is
+    parsed once. The size catches rewrites that land within the same mtime tick
+    on filesystems with coarse timestamps.
+
+    Args:
+        pyproject_path: Path to pyproject.toml
+        mtime_ns: File modification time, part of the cache key only
+        size: File size in bytes, part of the cache key only
+
+    Returns:
+        True if the file has a [tool.poetry] table listing donkit-ragops
+    """
+    try:
+        with open(pyproject_path, "rb") as f:
+            data = tomllib.load(f)
+    except (OSError, tomllib.TOMLDecodeError):
+        return False
+
+    poetry = data.get("tool", {}).get("poetry")
+    if not isinstance(poetry, dict):
+        return False
+    if _has_ragops_dependency(poetry.get("dependencies")):
+        return True
+    groups = poetry.get("group", {})
+    if isinstance(groups, dict) and any(
+        isinstance(group, dict) and _has_ragops_dependency(group.get("dependencies"))
+        for group in groups.values()
+    ):
+        return True
+    return _has_ragops_dependency(data.get("project", {}).get("dependencies"))
+
+
 def detect_install_method() -> InstallMethod:
     """Detect how donkit-ragops was installed.
 
     Returns:
         InstallMethod enum value
     """
-    executable = Path(sys.executable)
-
     # Check if running from pipx
     # pipx installs to ~/.local/pipx/venvs/ or similar paths
-    if "pipx" in str(executable):
+    if "pipx" in sys.executable:
         return InstallMethod.PIPX
 
     # Check if running from poetry virtual environment
     # Poetry venvs usually have pyproject.toml in parent directories
     current_dir = Path.cwd()
     for parent in [current_dir, *current_dir.parents]:
-        if (parent / "pyproject.toml").exists():
-            try:
-                with (parent / "pyproject.toml").open() as f:
-                    content = f.read()
-                    # Check if donkit-ragops is in dependencies
-                    if "donkit-ragops" in content and "[tool.poetry" in content:
-                        return InstallMethod.POETRY
-            except (OSError, UnicodeDecodeError):
-                pass
+        pyproject = parent / "pyproject.toml"
+        try:
+            stat = pyproject.stat()
+        except OSError:
+            continue
+        if _is_ragops_poetry_project(str(pyproject), stat.st_mtime_ns, stat.st_size):
+            return InstallMethod.POETRY
 
     # Default to pip
     return InstallMethod.PIP
@@ -61,15 +127,20 @@ def get_upgrade_command(method: InstallMethod) -> list[str]:
     Returns:
         Command as list of strings
     """
-    if method == InstallMethod.PIPX:
-        return ["pipx", "upgrade", "donkit-ragops"]
-    elif method == InstallMethod.POETRY:
-        return ["poetry", "update", "donkit-ragops"]
-    elif method == InstallMethod.PIP:
-        return [sys.executable, "-m", "pip", "install", "--upgrade", "donkit-ragops"]
-    else:
-        # Fallback to pip
-        return [sys.executable, "-m", "pip", "install", "--upgrade", "donkit-ragops"]
+    # Unknown methods fall back to pip; return a copy so callers may extend it
+    return list(_UPGRADE_COMMANDS.get(method, _PIP_UPGRADE_COMMAND))
+
+
+def _upgrade_outcome(returncode: int | None, stdout: bytes, stderr: bytes) -> tuple[bool, str]:
+    """Turn a finished upgrade command into a (success, output_message) tuple.
+
+    Output is captured as bytes and only the part that is returned gets decoded:
+    pip and poetry can print megabytes of progress that nobody reads on success.
+    """
+    if returncode == 0:
+        return True, stdout[-UPGRADE_OUTPUT_TAIL_BYTES:].decode(errors="replace")
+    output = stderr or stdout[-UPGRADE_OUTPUT_TAIL_BYTES:]
+    return False, output.decode(errors="replace") or "Unknown error"
 
 
 def run_upgrade(method: InstallMethod | None = None) -> tuple[bool, str]:
@@ -90,16 +161,10 @@ def run_upgrade(method: InstallMethod | None = None) -> tuple[bool, str]:
         result = subprocess.run(
             command,
             capture_output=True,
-            text=True,
-            timeout=300,  # 5 minutes timeout
+            timeout=UPGRADE_TIMEOUT_SECONDS,
             check=False,
         )
-
-        if result.returncode == 0:
-            return True, result.stdout
-        else:
-            error_msg = result.stderr or result.stdout or "Unknown error"
-            return False, error_msg
+        return _upgrade_outcome(result.returncode, result.stdout, result.stderr)
 
     except subprocess.TimeoutExpired:
         return False, "Upgrade timed out after 5 minutes"
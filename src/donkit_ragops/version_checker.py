@@ -6,15 +6,24 @@ Checks PyPI for newer versions and notifies users about available updates.
 from __future__ import annotations
 
 import json
+import os
+import threading
 import time
+from functools import lru_cache
 from pathlib import Path
 from typing import NamedTuple
 
 import httpx
+from packaging.version import InvalidVersion, Version
 
 PYPI_PACKAGE_URL = "https://pypi.org/pypi/donkit-ragops/json"
 CACHE_FILE = Path.home() / ".cache" / "donkit-ragops" / "version_check.json"
 CACHE_TTL_SECONDS = 12 * 60 * 60  # 24 hours
+PYPI_CONNECT_RETRIES = 2
+
+# Shared HTTP client, so repeated checks reuse the pooled TLS connection to PyPI
+_http_client: httpx.Client | None = None
+_http_client_lock = threading.Lock()
 
 
 class VersionInfo(NamedTuple):
@@ -25,32 +34,21 @@ class VersionInfo(NamedTuple):
     is_outdated: bool
 
 
-def _parse_version(version: str) -> tuple[int, ...]:
-    """Parse semantic version string into tuple of integers.
-
-    Args:
-        version: Version string like "0.5.1"
-
-    Returns:
-        Tuple of version components like (0, 5, 1)
-    """
-    try:
-        return tuple(int(x) for x in version.split("."))
-    except (ValueError, AttributeError):
-        return (0, 0, 0)
-
-
+@lru_cache(maxsize=128)
 def _compare_versions(current: str, latest: str) -> bool:
-    """Compare two semantic versions.
+    """Compare two versions using PEP 440 ordering.
 
     Args:
         current: Current version string
         latest: Latest version string
 
     Returns:
-        True if latest is newer than current
+        True if latest is newer than current, False if either is invalid
     """
-    return _parse_version(latest) > _parse_version(current)
+    try:
+        return Version(latest) > Version(current)
+    except InvalidVersion:
+        return False
 
 
 def _get_cached_version_info() -> VersionInfo | None:
@@ -59,12 +57,9 @@ def _get_cached_version_info() -> VersionInfo | None:
     Returns:
         Cached VersionInfo or None if cache is expired or missing
     """
-    if not CACHE_FILE.exists():
-        return None
-
     try:
-        with CACHE_FILE.open() as f:
-            data = json.load(f)
+        # Missing file surfaces as OSError, saving a separate exists() stat
+        data = json.loads(CACHE_FILE.read_bytes())
 
         # Check if cache is expired
         if time.time() - data.get("timestamp", 0) > CACHE_TTL_SECONDS:
@@ -75,10 +70,27 @@ def _get_cached_version_info() -> VersionInfo | None:
             latest=data["latest"],
             is_outdated=data["is_outdated"],
         )
-    except (json.JSONDecodeError, KeyError, OSError):
+    except (ValueError, KeyError, OSError):
+        # ValueError covers both JSONDecodeError and non-UTF-8 bytes
         return None
 
 
+@lru_cache(maxsize=8)
+def _ensure_dir(path: Path) -> Path:
+    """Create a directory (and parents) once per process.
+
+    A failed mkdir raises and is not cached, so the next call retries it.
+
+    Args:
+        path: Directory to create
+
+    Returns:
+        The same path
+    """
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
 def _save_version_cache(version_info: VersionInfo) -> None:
     """Save version info to cache.
 
@@ -86,22 +98,52 @@ def _save_version_cache(version_info: VersionInfo) -> None:
         version_info: VersionInfo to cache
     """
     try:
-        CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
-        with CACHE_FILE.open("w") as f:
-            json.dump(
-                {
-                    "current": version_info.current,
-                    "latest": version_info.latest,
-                    "is_outdated": version_info.is_outdated,
-                    "timestamp": time.time(),
-                },
-                f,
-            )
+        _ensure_dir(CACHE_FILE.parent)
+        payload = {
+            "current": version_info.current,
+            "latest": version_info.latest,
+            "is_outdated": version_info.is_outdated,
+            "timestamp": time.time(),
+        }
+        # Write to a per-process temp file and rename it into place, so concurrent
+        # CLI invocations never observe a partially written cache
+        tmp_file = CACHE_FILE.with_suffix(f".tmp.{os.getpid()}")
+        tmp_file.write_bytes(json.dumps(payload, separators=(",", ":")).encode())
+        os.replace(tmp_file, CACHE_FILE)
     except OSError:
         # Silently fail if can't write cache
         pass
 
 
+def _get_http_client() -> httpx.Client:
+    """Get the shared PyPI HTTP client, creating it on first use.
+
+    Returns:
+        Open httpx.Client instance
+    """
+    global _http_client
+
+    with _http_client_lock:
+        if _http_client is None or _http_client.is_closed:
+            # Retries only cover failed connection attempts, which are safe to repeat
+            transport = httpx.HTTPTransport(
+                retries=PYPI_CONNECT_RETRIES,
+                limits=httpx.Limits(max_keepalive_connections=4),
+            )
+            _http_client = httpx.Client(timeout=2.0, transport=transport)
+        return _http_client
+
+
+def close_version_check_client() -> None:
+    """Close the shared PyPI HTTP client (a later check opens a new one)."""
+    global _http_client
+
+    with _http_client_lock:
+        if _http_client is not None:
+            _http_client.close()
+            _http_client = None
+
+
 def _fetch_latest_version_from_pypi() -> str | None:
     """Fetch latest version from PyPI.
 
@@ -109,7 +151,7 @@ def _fetch_latest_version_from_pypi() -> str | None:
         Latest version string or None if request fails
     """
     try:
-        response = httpx.get(PYPI_PACKAGE_URL, timeout=2.0)
+        response = _get_http_client().get(PYPI_PACKAGE_URL)
         response.raise_for_status()
         data = response.json()
         return data["info"]["version"]
@@ -153,6 +195,45 @@ def check_for_updates(current_version: str, use_cache: bool = True) -> VersionIn
     return version_info
 
 
+def _refresh_version_cache(current_version: str) -> None:
+    """Fetch the latest version from PyPI and save it to the cache.
+
+    Args:
+        current_version: Current installed version
+    """
+    try:
+        check_for_updates(current_version, use_cache=False)
+    except Exception:
+        # Never let a background check print a traceback into the user's session
+        pass
+
+
+def check_for_updates_in_background(current_version: str) -> VersionInfo | None:
+    """Return cached update status, refreshing a stale cache on a background thread.
+
+    Unlike check_for_updates(), this never waits on PyPI. When the cache is
+    missing, expired or was written by another version, a daemon thread fetches
+    the latest version and saves it, so the next invocation can notify the user.
+
+    Args:
+        current_version: Current installed version
+
+    Returns:
+        Cached VersionInfo, or None if a background refresh was started
+    """
+    cached = _get_cached_version_info()
+    if cached is not None and cached.current == current_version:
+        return cached
+
+    threading.Thread(
+        target=_refresh_version_cache,
+        args=(current_version,),
+        name="donkit-ragops-version-check",
+        daemon=True,
+    ).start()
+    return None
+
+
 def print_update_notification(version_info: VersionInfo) -> None:
     """Print update notification if newer version is available.
 
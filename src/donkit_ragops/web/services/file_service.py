@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+from pathlib import PureWindowsPath
 from typing import TYPE_CHECKING
 
 import aiofiles
@@ -13,6 +14,16 @@ if TYPE_CHECKING:
     from donkit_ragops.web.session.models import WebSession
 
 
+def _is_plain_filename(name: str) -> bool:
+    """Check that name is a bare file name that stays inside the directory it is joined to.
+
+    Windows path rules are used on every platform: they treat both slashes as
+    separators and strip drive prefixes (C:\\x, C:x), so anything with a
+    directory, root or drive component fails the comparison.
+    """
+    return name not in ("", ".", "..") and PureWindowsPath(name).name == name
+
+
 class FileService:
     """Service for handling file uploads and management."""
 
@@ -34,11 +45,17 @@ class FileService:
             Dict with file info (path, name, size)
 
         Raises:
-            ValueError: If file is too large or session has no files dir
+            ValueError: If file is too large, its name escapes the session's
+                files dir, or session has no files dir
         """
         if not session.files_dir:
             raise ValueError("Session has no files directory")
 
+        # Use original filename
+        original_name = file.filename or "unnamed_file"
+        if not _is_plain_filename(original_name):
+            raise ValueError(f"Invalid file name: {original_name}")
+
         # Read file content
         content = await file.read()
         file_size = len(content)
@@ -50,8 +67,6 @@ class FileService:
                 f"(max {self._max_size_bytes / 1024 / 1024:.0f}MB)"
             )
 
-        # Use original filename
-        original_name = file.filename or "unnamed_file"
         file_path = session.files_dir / original_name
 
         # Skip if file already exists
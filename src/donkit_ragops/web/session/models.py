@@ -89,9 +89,13 @@ class WebSession:
         return self.websocket is not None
 
 
-@dataclass
+@dataclass(frozen=True)
 class SessionInfo:
-    """Session information for API responses."""
+    """Session information for API responses.
+
+    A read-only snapshot of a WebSession; build a new one with from_session()
+    rather than updating it.
+    """
 
     id: str
     provider: str
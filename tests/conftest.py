@@ -1,3 +1,4 @@
+import asyncio
 import json
 
 import pytest
@@ -6,7 +7,7 @@ import sys
 from contextlib import contextmanager
 from pathlib import Path
 from typing import Any, AsyncIterator
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 from donkit.llm import (
     FunctionCall,
     GenerateRequest,
@@ -50,6 +51,15 @@ def clear_enterprise_env_vars():
         os.environ[var] = value
 
 
+def pytest_asyncio_loop_factories(config, item):
+    """Run async tests on uvloop where it is installed (uvicorn[standard], non-Windows)."""
+    try:
+        import uvloop
+    except ImportError:
+        return {"asyncio": asyncio.new_event_loop}
+    return {"uvloop": uvloop.new_event_loop}
+
+
 @pytest.fixture(autouse=True)
 def disable_loguru():
     """Disable loguru logging during tests to prevent pytest capture issues."""
@@ -270,6 +280,8 @@ def mocked_mcp_client():
     """Pre-configured MCP client mock with common setup.
 
     Yields a context manager that provides mock_client_class and mock_client_instance.
+    Every use builds fresh mocks, so attributes a test replaces outright
+    (e.g. mock_instance.call_tool = ...) never leak into other tests.
 
     Usage:
         with mocked_mcp_client() as (mock_class, mock_instance):
@@ -238,7 +238,7 @@ def test_cli_version_check_called_on_startup(cli_mocks) -> None:
     """Test that version check is called on startup."""
     mock_setup, mock_select, mock_repl = cli_mocks
 
-    with patch("donkit_ragops.cli.check_for_updates") as mock_check:
+    with patch("donkit_ragops.cli.check_for_updates_in_background") as mock_check:
         mock_check.return_value = None  # Simulate no update available
 
         result = runner.invoke(app, [], input="")
@@ -249,7 +249,7 @@ def test_cli_version_check_called_on_startup(cli_mocks) -> None:
 
 def test_cli_version_check_not_called_for_subcommands() -> None:
     """Test that version check is not called for subcommands like ping."""
-    with patch("donkit_ragops.cli.check_for_updates") as mock_check:
+    with patch("donkit_ragops.cli.check_for_updates_in_background") as mock_check:
         result = runner.invoke(app, ["ping"])
 
         # Version check should not be called for subcommands
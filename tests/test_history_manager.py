@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from unittest.mock import AsyncMock, Mock
+from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 from donkit.llm import FunctionCall, GenerateResponse, Message, ToolCall
@@ -10,13 +10,32 @@ from donkit.llm import FunctionCall, GenerateResponse, Message, ToolCall
 from donkit_ragops.history_manager import (
     FALLBACK_TRUNCATION_NOTICE,
     HISTORY_TOKEN_THRESHOLD,
+    PER_MESSAGE_OVERHEAD,
     _compress_tool_calls_in_turn,
     _emergency_truncate_messages,
     _estimate_token_count,
+    _estimate_with_known_counts,
+    _extract_countable_strings,
+    _fast_message,
+    _get_tiktoken_encoding,
     _find_recent_complete_turns,
+    _message_token_counts,
+    _role_codes,
+    _token_upper_bound,
     compress_history_if_needed,
 )
 
+# ~110K tokens; two of these exceed HISTORY_TOKEN_THRESHOLD
+_LARGE_TEXT = "x " * 110_000
+
+
+@pytest.fixture
+def provider():
+    """LLM provider mock; tests configure generate.return_value / side_effect."""
+    p = Mock()
+    p.generate = AsyncMock()
+    return p
+
 
 class TestFindRecentCompleteTurns:
     """Tests for _find_recent_complete_turns helper."""
@@ -102,6 +121,24 @@ class TestFindRecentCompleteTurns:
         result = _find_recent_complete_turns(messages, num_turns=5)
         assert result == messages
 
+    @pytest.mark.parametrize("num_turns", [0, 1, 2, 3, 4])
+    def test_matches_user_index_lookup(self, num_turns):
+        """Should start at the num_turns-th user message from the end (0: the first one)."""
+        messages = [
+            Message(role="assistant", content="greeting"),
+            Message(role="user", content="Q1"),
+            Message(role="user", content="Q2"),
+            Message(role="assistant", content="A2"),
+            Message(role="tool", tool_call_id="call_1", content="out"),
+            Message(role="user", content="Q3"),
+        ]
+        user_indices = [i for i, m in enumerate(messages) if m.role == "user"]
+        expected_start = user_indices[-min(num_turns, len(user_indices))]
+
+        result = _find_recent_complete_turns(messages, num_turns=num_turns)
+
+        assert result == messages[expected_start:]
+
 
 class TestEstimateTokenCount:
     """Tests for _estimate_token_count helper."""
@@ -128,6 +165,64 @@ class TestEstimateTokenCount:
         result = _estimate_token_count(messages)
         assert result == 4  # Only per-message overhead
 
+    def test_encoding_loaded_once(self):
+        """Should reuse a single tiktoken encoding across estimates."""
+        _estimate_token_count([Message(role="user", content="warm up")])
+        misses = _get_tiktoken_encoding.cache_info().misses
+        _estimate_token_count([Message(role="user", content="again")])
+        assert _get_tiktoken_encoding.cache_info().misses == misses
+        assert _get_tiktoken_encoding() is _get_tiktoken_encoding()
+
+    def test_long_text_token_count_memoized(self):
+        """Should tokenize identical long content only once."""
+        encoding = Mock()
+        encoding.encode_ordinary_batch.return_value = [[1, 2, 3]]
+        messages = [Message(role="user", content="long text " * 100)]
+
+        with (
+            patch("donkit_ragops.history_manager._get_tiktoken_encoding", return_value=encoding),
+            patch.dict("donkit_ragops.history_manager._token_count_memo", clear=True),
+        ):
+            first = _estimate_token_count(messages)
+            second = _estimate_token_count(messages)
+
+        assert first == second
+        encoding.encode_ordinary_batch.assert_called_once()
+
+    def test_messages_tokenized_in_one_batch(self):
+        """Should encode all message strings with a single batch call."""
+        encoding = Mock()
+        encoding.encode_ordinary_batch.side_effect = lambda texts, num_threads: [
+            [0] * len(text.split()) for text in texts
+        ]
+        messages = [
+            Message(role="user", content="one two"),
+            Message(role="assistant", content="three four five"),
+        ]
+
+        with (
+            patch("donkit_ragops.history_manager._get_tiktoken_encoding", return_value=encoding),
+            patch.dict("donkit_ragops.history_manager._token_count_memo", clear=True),
+        ):
+            counts = _message_token_counts(messages)
+
+        encoding.encode_ordinary_batch.assert_called_once()
+        assert counts == [PER_MESSAGE_OVERHEAD + 2, PER_MESSAGE_OVERHEAD + 3]
+
+    def test_fallback_counts_utf8_bytes(self):
+        """Fallback estimate should scale with UTF-8 size for non-ASCII text."""
+        messages = [Message(role="user", content="模型" * 100)]  # 600 UTF-8 bytes
+
+        with patch("donkit_ragops.history_manager._get_tiktoken_encoding", return_value=None):
+            result = _estimate_token_count(messages)
+
+        assert result == PER_MESSAGE_OVERHEAD + 600 // 4
+
+    def test_overhead_scales_with_message_count(self):
+        """Should add exactly one per-message overhead for each message."""
+        messages = [Message(role="assistant", content=None) for _ in range(3)]
+        assert _estimate_token_count(messages) == PER_MESSAGE_OVERHEAD * 3
+
     def test_tool_calls_counted(self):
         """Should count tokens from tool calls."""
         messages_without_tools = [
@@ -152,6 +247,25 @@ class TestEstimateTokenCount:
         tokens_with = _estimate_token_count(messages_with_tools)
         assert tokens_with > tokens_without
 
+    def test_tool_call_arguments_estimated_from_length(self):
+        """Should bound tool-call arguments by length unless precise counting is requested."""
+        messages = [
+            Message(
+                role="assistant",
+                content=None,
+                tool_calls=[
+                    ToolCall(
+                        id="call_1",
+                        function=FunctionCall(name="write_file", arguments="a" * 10_000),
+                    )
+                ],
+            ),
+        ]
+        estimated = _estimate_token_count(messages)
+        precise = _estimate_token_count(messages, precise=True)
+        assert estimated >= 10_000 // 2
+        assert precise < estimated
+
     def test_tool_call_id_counted(self):
         """Should count tokens from tool_call_id."""
         messages = [
@@ -174,11 +288,102 @@ class TestEstimateTokenCount:
         assert result > 10_000
 
 
+class TestFastMessage:
+    """Tests for _fast_message helper."""
+
+    def test_matches_validated_message(self):
+        """Should build a message equal to a normally constructed one."""
+        fast = _fast_message("assistant", "summary")
+        assert fast == Message(role="assistant", content="summary")
+        assert fast.tool_calls is None
+
+
+class TestMessageTokenCounts:
+    """Tests for per-message token counting helpers."""
+
+    def test_counts_sum_to_estimate(self):
+        """Per-message counts should add up to the whole-list estimate."""
+        messages = [
+            Message(role="user", content="Hello world!"),
+            Message(role="assistant", content=None),
+            Message(role="tool", tool_call_id="call_1", content="result"),
+        ]
+        counts = _message_token_counts(messages)
+        assert len(counts) == len(messages)
+        assert counts[1] == 4
+        assert sum(counts) == _estimate_token_count(messages)
+
+    def test_known_counts_are_reused(self):
+        """Should take counts of already measured messages from known_counts."""
+        measured = Message(role="user", content="already measured")
+        fresh = Message(role="assistant", content=None)
+        known_counts = {id(measured): 1_000}
+
+        with patch(
+            "donkit_ragops.history_manager._count_texts_tokens", return_value=[]
+        ) as mock_count:
+            result = _estimate_with_known_counts([measured, fresh], known_counts)
+
+        assert result == 1_000 + 4
+        for call in mock_count.call_args_list:
+            assert "already measured" not in call.args[0]
+
+
+class TestExtractCountableStrings:
+    """Tests for _extract_countable_strings helper."""
+
+    def test_collects_columns_in_one_pass(self):
+        """Should gather strings, per-message counts, argument estimates and roles."""
+        messages = [
+            Message(role="system", content="sys"),
+            Message(
+                role="assistant",
+                content=None,
+                tool_calls=[
+                    ToolCall(
+                        id="call_1",
+                        function=FunctionCall(name="read", arguments='{"p": "a"}'),
+                    )
+                ],
+            ),
+            Message(role="tool", tool_call_id="call_1", content="ok"),
+        ]
+
+        fields = _extract_countable_strings(messages, include_arguments=False)
+
+        assert fields.strings == ["sys", "read", "ok", "call_1"]
+        assert fields.counts == [1, 1, 2]
+        assert fields.argument_tokens == [0, len('{"p": "a"}') // 2, 0]
+        assert fields.roles == _role_codes(messages)
+
+
+class TestTokenUpperBound:
+    """Tests for _token_upper_bound helper."""
+
+    def test_bounds_ascii_estimate(self):
+        """Should never be below the tokenizer estimate for ASCII text."""
+        messages = [
+            Message(role="user", content="word " * 1_000),
+            Message(role="tool", tool_call_id="call_1", content='{"key": "value"}'),
+        ]
+        assert _token_upper_bound(messages) >= _estimate_token_count(messages)
+
+    def test_bounds_single_character_words(self):
+        """Should stay above the estimate for dense text like the large test fixtures."""
+        messages = [Message(role="user", content="x " * 10_000)]
+        assert _token_upper_bound(messages) >= _estimate_token_count(messages, precise=True)
+
+    def test_bounds_non_ascii_estimate(self):
+        """Should never be below the tokenizer estimate for multi-byte text."""
+        messages = [Message(role="user", content="模型🙂" * 1_000)]
+        assert _token_upper_bound(messages) >= _estimate_token_count(messages)
+
+
 class TestCompressHistoryIfNeeded:
     """Tests for compress_history_if_needed."""
 
     @pytest.mark.asyncio
-    async def test_no_compression_below_threshold(self):
+    async def test_no_compression_below_threshold(self, provider):
         """Should not compress if estimated tokens below threshold."""
         history = [
             Message(role="system", content="System prompt"),
@@ -187,31 +392,51 @@ class TestCompressHistoryIfNeeded:
             Message(role="user", content="Q2"),
             Message(role="assistant", content="A2"),
         ]
-        provider = Mock()
 
         result = await compress_history_if_needed(history, provider)
 
         # Should return original history unchanged
-        assert result == history
+        assert result is history
         provider.generate.assert_not_called()
 
     @pytest.mark.asyncio
-    async def test_compression_preserves_system_messages(self):
+    async def test_small_history_skips_tokenization(self, provider):
+        """Should not run the tokenizer when the cheap bound rules out compression."""
+        history = [
+            Message(role="user", content="Q1"),
+            Message(role="assistant", content="A1"),
+        ]
+
+        with patch("donkit_ragops.history_manager._count_texts_tokens") as mock_count:
+            result = await compress_history_if_needed(history, provider)
+
+        assert result is history
+        mock_count.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_small_history_does_not_load_tiktoken(self, provider):
+        """Should not even load the tiktoken encoding on the below-threshold path."""
+        history = [Message(role="user", content="Q1")]
+
+        with patch("donkit_ragops.history_manager._get_tiktoken_encoding") as mock_encoding:
+            result = await compress_history_if_needed(history, provider)
+
+        assert result is history
+        mock_encoding.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_compression_preserves_system_messages(self, provider):
         """Should preserve system messages when compressing."""
         # Create large messages to exceed 220K token threshold
-        large_text = "x " * 110_000  # ~110K tokens
         history = [
             Message(role="system", content="System prompt"),
-            Message(role="user", content=large_text),
-            Message(role="assistant", content=large_text),
+            Message(role="user", content=_LARGE_TEXT),
+            Message(role="assistant", content=_LARGE_TEXT),
             Message(role="user", content="Q2"),
             Message(role="assistant", content="A2"),
         ]
 
-        provider = Mock()
-        provider.generate = AsyncMock(
-            return_value=GenerateResponse(content="Summary of conversation")
-        )
+        provider.generate.return_value = GenerateResponse(content="Summary of conversation")
 
         result = await compress_history_if_needed(history, provider)
 
@@ -225,14 +450,13 @@ class TestCompressHistoryIfNeeded:
         assert result[3].content == "A2"
 
     @pytest.mark.asyncio
-    async def test_compression_preserves_tool_calls(self):
+    async def test_compression_preserves_tool_calls(self, provider):
         """Should preserve complete turn with tool calls and results."""
         # Create large messages to exceed 220K token threshold
-        large_text = "x " * 110_000  # ~110K tokens
         history = [
             Message(role="system", content="System"),
-            Message(role="user", content=large_text),
-            Message(role="assistant", content=large_text),
+            Message(role="user", content=_LARGE_TEXT),
+            Message(role="assistant", content=_LARGE_TEXT),
             # Last turn with tool calls
             Message(role="user", content="Q with tool"),
             Message(
@@ -249,10 +473,7 @@ class TestCompressHistoryIfNeeded:
             Message(role="assistant", content="Final answer"),
         ]
 
-        provider = Mock()
-        provider.generate = AsyncMock(
-            return_value=GenerateResponse(content="Summary of old messages")
-        )
+        provider.generate.return_value = GenerateResponse(content="Summary of old messages")
 
         result = await compress_history_if_needed(history, provider)
 
@@ -267,18 +488,16 @@ class TestCompressHistoryIfNeeded:
         assert result[5].content == "Final answer"
 
     @pytest.mark.asyncio
-    async def test_compression_failure_uses_mechanical_fallback(self):
+    async def test_compression_failure_uses_mechanical_fallback(self, provider):
         """Should use mechanical fallback when LLM compression fails."""
-        large_text = "x " * 110_000  # ~110K tokens to exceed threshold
         history = [
-            Message(role="user", content=large_text),
-            Message(role="assistant", content=large_text),
+            Message(role="user", content=_LARGE_TEXT),
+            Message(role="assistant", content=_LARGE_TEXT),
             Message(role="user", content="Q2"),
             Message(role="assistant", content="A2"),
         ]
 
-        provider = Mock()
-        provider.generate = AsyncMock(side_effect=Exception("LLM failed"))
+        provider.generate.side_effect = Exception("LLM failed")
 
         result = await compress_history_if_needed(history, provider)
 
@@ -291,7 +510,7 @@ class TestCompressHistoryIfNeeded:
         assert result[-1].content == "A2"
 
     @pytest.mark.asyncio
-    async def test_token_threshold_with_tool_calls(self):
+    async def test_token_threshold_with_tool_calls(self, provider):
         """Should account for tool call tokens when evaluating threshold."""
         # Create history where tool calls push it over the threshold
         # Use "x " pattern to avoid tiktoken compressing repeated single chars
@@ -316,8 +535,7 @@ class TestCompressHistoryIfNeeded:
             Message(role="assistant", content="Next answer"),
         ]
 
-        provider = Mock()
-        provider.generate = AsyncMock(return_value=GenerateResponse(content="Summary"))
+        provider.generate.return_value = GenerateResponse(content="Summary")
 
         result = await compress_history_if_needed(history, provider)
 
@@ -326,19 +544,17 @@ class TestCompressHistoryIfNeeded:
         provider.generate.assert_called_once()
 
     @pytest.mark.asyncio
-    async def test_fallback_preserves_system_messages(self):
+    async def test_fallback_preserves_system_messages(self, provider):
         """Mechanical fallback should preserve system messages."""
-        large_text = "x " * 110_000
         history = [
             Message(role="system", content="Important system prompt"),
-            Message(role="user", content=large_text),
-            Message(role="assistant", content=large_text),
+            Message(role="user", content=_LARGE_TEXT),
+            Message(role="assistant", content=_LARGE_TEXT),
             Message(role="user", content="Q2"),
             Message(role="assistant", content="A2"),
         ]
 
-        provider = Mock()
-        provider.generate = AsyncMock(side_effect=Exception("Context too large"))
+        provider.generate.side_effect = Exception("Context too large")
 
         result = await compress_history_if_needed(history, provider)
 
@@ -349,15 +565,14 @@ class TestCompressHistoryIfNeeded:
         assert result[-1].content == "A2"
 
     @pytest.mark.asyncio
-    async def test_emergency_truncation_when_last_turn_is_huge(self):
+    async def test_emergency_truncation_when_last_turn_is_huge(self, provider):
         """Should emergency-truncate individual messages when last turn exceeds threshold."""
         # Old part exceeds threshold to trigger compression
-        large_old = "x " * 110_000
         # Last turn tool result is huge — exceeds threshold on its own
         large_tool_result = "y " * 210_000
         history = [
-            Message(role="user", content=large_old),
-            Message(role="assistant", content=large_old),
+            Message(role="user", content=_LARGE_TEXT),
+            Message(role="assistant", content=_LARGE_TEXT),
             Message(role="user", content="Q2"),
             Message(
                 role="assistant",
@@ -373,8 +588,7 @@ class TestCompressHistoryIfNeeded:
             Message(role="assistant", content="Final"),
         ]
 
-        provider = Mock()
-        provider.generate = AsyncMock(side_effect=Exception("Context too large"))
+        provider.generate.side_effect = Exception("Context too large")
 
         result = await compress_history_if_needed(history, provider)
 
@@ -459,6 +673,21 @@ class TestCompressToolCallsInTurn:
         result = _compress_tool_calls_in_turn(msgs, num_recent_pairs=3)
         assert len(result) == len(msgs)
 
+    def test_leading_tool_result_counts_as_pair(self):
+        """A tool result before the first tool call forms its own (compressible) pair."""
+        msgs = [
+            Message(role="user", content="continue"),
+            Message(role="tool", tool_call_id="c0", content="orphan result"),
+        ]
+        msgs += self._make_tool_pair("tool_a", "result_a", "c1")
+        msgs += self._make_tool_pair("tool_b", "result_b", "c2")
+
+        result = _compress_tool_calls_in_turn(msgs, num_recent_pairs=2)
+
+        assert len(result) == len(msgs)
+        assert "orphan result" in result[1].content
+        assert result[-1].content == "result_b"
+
     def test_compresses_old_pairs(self):
         """Should compress old tool pairs, keeping recent ones."""
         msgs = [Message(role="user", content="build RAG")]
@@ -514,7 +743,7 @@ class TestCompressWithinSingleTurn:
     """Integration tests: compress_history_if_needed with single-turn autonomous work."""
 
     @pytest.mark.asyncio
-    async def test_single_turn_with_many_tool_calls(self):
+    async def test_single_turn_with_many_tool_calls(self, provider):
         """Should compress tool calls within a single turn when it exceeds threshold."""
         # Simulate autonomous agent: one user msg + many tool calls with big results
         history = [
@@ -547,9 +776,8 @@ class TestCompressWithinSingleTurn:
                 )
             )
 
-        provider = Mock()
         # provider.generate should NOT be called — no previous turns to summarize
-        provider.generate = AsyncMock(side_effect=Exception("should not be called"))
+        provider.generate.side_effect = Exception("should not be called")
 
         result = await compress_history_if_needed(history, provider)
 
@@ -565,7 +793,7 @@ class TestCompressWithinSingleTurn:
         )
 
     @pytest.mark.asyncio
-    async def test_single_turn_result_fits_in_threshold(self):
+    async def test_single_turn_result_fits_in_threshold(self, provider):
         """After compression within a single turn, result must fit in the token threshold."""
         history = [
             Message(role="system", content="System prompt"),
@@ -590,8 +818,7 @@ class TestCompressWithinSingleTurn:
                 Message(role="tool", tool_call_id=f"call_{i}", content=large_result)
             )
 
-        provider = Mock()
-        provider.generate = AsyncMock(side_effect=Exception("should not be called"))
+        provider.generate.side_effect = Exception("should not be called")
 
         result = await compress_history_if_needed(history, provider)
 
@@ -603,14 +830,13 @@ class TestCompressWithinSingleTurn:
         assert result_tokens < HISTORY_TOKEN_THRESHOLD * 1.5  # allow some headroom
 
     @pytest.mark.asyncio
-    async def test_multi_turn_result_fits_in_threshold(self):
+    async def test_multi_turn_result_fits_in_threshold(self, provider):
         """After LLM summary compression, result must fit in the token threshold."""
         # Turn 1: big
-        large_text = "x " * 110_000
         history = [
             Message(role="system", content="System prompt"),
-            Message(role="user", content=large_text),
-            Message(role="assistant", content=large_text),
+            Message(role="user", content=_LARGE_TEXT),
+            Message(role="assistant", content=_LARGE_TEXT),
             # Turn 2: current turn with several tool calls
             Message(role="user", content="now do stuff"),
         ]
@@ -632,10 +858,7 @@ class TestCompressWithinSingleTurn:
                 Message(role="tool", tool_call_id=f"call_{i}", content=big_result)
             )
 
-        provider = Mock()
-        provider.generate = AsyncMock(
-            return_value=GenerateResponse(content="Summary of old turn")
-        )
+        provider.generate.return_value = GenerateResponse(content="Summary of old turn")
 
         result = await compress_history_if_needed(history, provider)
 
@@ -649,7 +872,7 @@ class TestCompressWithinSingleTurn:
         assert any("COMPRESSED TOOL HISTORY" in (m.content or "") for m in result)
 
     @pytest.mark.asyncio
-    async def test_shrink_tool_results_before_llm_summary(self):
+    async def test_shrink_tool_results_before_llm_summary(self, provider):
         """LLM should receive shrunk tool results, not full payloads."""
         large_tool_output = "x " * 200_000  # huge tool result in old turn
         history = [
@@ -678,8 +901,7 @@ class TestCompressWithinSingleTurn:
             captured_request["messages"] = request.messages
             return GenerateResponse(content="Summary")
 
-        provider = Mock()
-        provider.generate = AsyncMock(side_effect=capture_generate)
+        provider.generate.side_effect = capture_generate
 
         await compress_history_if_needed(history, provider)
 
@@ -690,3 +912,23 @@ class TestCompressWithinSingleTurn:
                 # Tool result sent to LLM must be truncated
                 assert len(msg.content) < len(large_tool_output)
                 assert "truncated" in msg.content
+
+    @pytest.mark.asyncio
+    async def test_messages_before_single_user_turn_are_summarized(self, provider):
+        """Messages preceding the only user message are still summarized by the LLM."""
+        history = [
+            Message(role="system", content="System prompt"),
+            Message(role="assistant", content=_LARGE_TEXT),
+            Message(role="assistant", content=_LARGE_TEXT),
+            Message(role="user", content="only question"),
+            Message(role="assistant", content="answer"),
+        ]
+
+        provider.generate.return_value = GenerateResponse(content="Summary")
+
+        result = await compress_history_if_needed(history, provider)
+
+        provider.generate.assert_called_once()
+        assert "[CONVERSATION HISTORY SUMMARY]" in result[1].content
+        assert result[-2].content == "only question"
+        assert result[-1].content == "answer"
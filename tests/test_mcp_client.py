@@ -12,23 +12,51 @@ from __future__ import annotations
 
 import asyncio
 import json
-from unittest.mock import AsyncMock, MagicMock, Mock, patch
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 
-from donkit_ragops.mcp.client import MCPClient
+from donkit_ragops.mcp.client import (
+    MAX_TEMPORARY_CONNECTIONS,
+    RECONNECT_BACKOFF_MAX,
+    MCPClient,
+)
 
 # ============================================================================
 # Fixtures
 # ============================================================================
 
 
+def _tool(name: str, description: str, input_schema: dict) -> SimpleNamespace:
+    """Build a plain tool object as returned by Client.list_tools()."""
+    return SimpleNamespace(name=name, description=description, inputSchema=input_schema)
+
+
+def _tool_result(text: str | None = None, data: object = None) -> SimpleNamespace:
+    """Build a plain Client.call_tool() result with text content or structured data."""
+    content = [SimpleNamespace(text=text)] if text is not None else None
+    return SimpleNamespace(content=content, data=data)
+
+
 @pytest.fixture
 def mcp_client() -> MCPClient:
     """Create a basic MCP client for testing."""
     return MCPClient(command="python", args=["dummy_server.py"])
 
 
+@pytest.fixture
+def mocked_call_tool(mocked_mcp_client):
+    """Patch the FastMCP Client for the whole test, with call_tool() as an AsyncMock.
+
+    Yields:
+        Tuple of (mock_class, mock_call_tool); set mock_call_tool.return_value per test.
+    """
+    with mocked_mcp_client() as (mock_class, mock_instance):
+        mock_instance.call_tool = AsyncMock()
+        yield mock_class, mock_instance.call_tool
+
+
 @pytest.fixture
 def mcp_client_with_callback() -> MCPClient:
     """Create an MCP client with progress callback."""
@@ -58,13 +86,11 @@ def test_mcp_client_initialization_with_callback() -> None:
     assert client.progress_callback is callback
 
 
-def test_mcp_client_loads_environment() -> None:
+def test_mcp_client_loads_environment(mcp_client: MCPClient) -> None:
     """Test that MCPClient loads environment variables."""
-    client = MCPClient(command="python", args=["server.py"])
-
     # Should have loaded environment (at least os.environ)
-    assert isinstance(client._env, dict)
-    assert len(client._env) > 0
+    assert isinstance(mcp_client._env, dict)
+    assert len(mcp_client._env) > 0
 
 
 # ============================================================================
@@ -73,26 +99,25 @@ def test_mcp_client_loads_environment() -> None:
 
 
 @pytest.mark.asyncio
-async def test_alist_tools_success(mocked_mcp_client) -> None:
+async def test_alist_tools_success(mocked_mcp_client, mcp_client: MCPClient) -> None:
     """Test successful tool discovery from MCP server."""
-    client = MCPClient(command="python", args=["server.py"])
-
     # Mock the FastMCP Client
-    mock_tool = MagicMock()
-    mock_tool.name = "test_tool"
-    mock_tool.description = "A test tool"
-    mock_tool.inputSchema = {
-        "type": "object",
-        "properties": {
-            "param1": {"type": "string"},
-            "param2": {"type": "integer"},
+    mock_tool = _tool(
+        "test_tool",
+        "A test tool",
+        {
+            "type": "object",
+            "properties": {
+                "param1": {"type": "string"},
+                "param2": {"type": "integer"},
+            },
+            "required": ["param1"],
         },
-        "required": ["param1"],
-    }
+    )
 
     with mocked_mcp_client() as (mock_class, mock_instance):
         mock_instance.list_tools = AsyncMock(return_value=[mock_tool])
-        tools = await client.alist_tools()
+        tools = await mcp_client.alist_tools()
 
     assert len(tools) == 1
     assert tools[0]["name"] == "test_tool"
@@ -101,34 +126,33 @@ async def test_alist_tools_success(mocked_mcp_client) -> None:
 
 
 @pytest.mark.asyncio
-async def test_alist_tools_with_wrapped_schema(mocked_mcp_client) -> None:
+async def test_alist_tools_with_wrapped_schema(mocked_mcp_client, mcp_client: MCPClient) -> None:
     """Test tool discovery with FastMCP wrapped schema (args wrapper)."""
-    client = MCPClient(command="python", args=["server.py"])
-
     # Mock tool with wrapped schema (FastMCP wraps in {"args": <model>})
-    mock_tool = MagicMock()
-    mock_tool.name = "wrapped_tool"
-    mock_tool.description = "Tool with wrapped schema"
-    mock_tool.inputSchema = {
-        "type": "object",
-        "properties": {
-            "args": {"$ref": "#/$defs/ArgsModel"},
+    mock_tool = _tool(
+        "wrapped_tool",
+        "Tool with wrapped schema",
+        {
+            "type": "object",
+            "properties": {
+                "args": {"$ref": "#/$defs/ArgsModel"},
+            },
+            "$defs": {
+                "ArgsModel": {
+                    "type": "object",
+                    "properties": {
+                        "file_path": {"type": "string"},
+                        "count": {"type": "integer"},
+                    },
+                    "required": ["file_path"],
+                }
+            },
         },
-        "$defs": {
-            "ArgsModel": {
-                "type": "object",
-                "properties": {
-                    "file_path": {"type": "string"},
-                    "count": {"type": "integer"},
-                },
-                "required": ["file_path"],
-            }
-        },
-    }
+    )
 
     with mocked_mcp_client() as (mock_class, mock_instance):
         mock_instance.list_tools = AsyncMock(return_value=[mock_tool])
-        tools = await client.alist_tools()
+        tools = await mcp_client.alist_tools()
 
     assert len(tools) == 1
     # Should unwrap the schema
@@ -148,14 +172,12 @@ async def test_alist_tools_connection_error(mocked_mcp_client) -> None:
 
 
 @pytest.mark.asyncio
-async def test_alist_tools_cancellation(mocked_mcp_client) -> None:
+async def test_alist_tools_cancellation(mocked_mcp_client, mcp_client: MCPClient) -> None:
     """Test tool discovery handles cancellation properly."""
-    client = MCPClient(command="python", args=["server.py"])
-
     with mocked_mcp_client() as (mock_class, mock_instance):
         mock_instance.__aenter__ = AsyncMock(side_effect=asyncio.CancelledError("Cancelled"))
         with pytest.raises(asyncio.CancelledError):
-            await client.alist_tools()
+            await mcp_client.alist_tools()
 
 
 # ============================================================================
@@ -165,10 +187,7 @@ async def test_alist_tools_cancellation(mocked_mcp_client) -> None:
 
 def test_list_tools_success(mcp_client: MCPClient) -> None:
     """Test synchronous tool listing."""
-    mock_tool = MagicMock()
-    mock_tool.name = "sync_tool"
-    mock_tool.description = "Synchronous tool"
-    mock_tool.inputSchema = {"type": "object", "properties": {}}
+    mock_tool = _tool("sync_tool", "Synchronous tool", {"type": "object", "properties": {}})
 
     with patch.object(mcp_client, "alist_tools", new_callable=AsyncMock) as mock_alist:
         mock_alist.return_value = [
@@ -201,40 +220,31 @@ def test_list_tools_keyboard_interrupt(mcp_client: MCPClient) -> None:
 
 
 @pytest.mark.asyncio
-async def test_acall_tool_success(mocked_mcp_client) -> None:
+async def test_acall_tool_success(mocked_call_tool, mcp_client: MCPClient) -> None:
     """Test successful tool call with proper argument wrapping."""
-    client = MCPClient(command="python", args=["server.py"])
-
     # Mock tool result
-    mock_content = MagicMock()
-    mock_content.text = "Tool executed successfully"
-    mock_result = MagicMock()
-    mock_result.content = [mock_content]
+    mock_result = _tool_result(text="Tool executed successfully")
 
-    with mocked_mcp_client() as (mock_class, mock_instance):
-        mock_instance.call_tool = AsyncMock(return_value=mock_result)
-        result = await client.acall_tool("test_tool", {"param": "value"})
+    _, mock_call_tool = mocked_call_tool
+    mock_call_tool.return_value = mock_result
+    result = await mcp_client.acall_tool("test_tool", {"param": "value"})
 
     assert result == "Tool executed successfully"
     # Verify that arguments were wrapped
-    mock_instance.call_tool.assert_called_once()
-    call_args = mock_instance.call_tool.call_args
+    mock_call_tool.assert_called_once()
+    call_args = mock_call_tool.call_args
     assert call_args[0][0] == "test_tool"
     assert call_args[0][1] == {"args": {"param": "value"}}
 
 
 @pytest.mark.asyncio
-async def test_acall_tool_with_data_result(mocked_mcp_client) -> None:
+async def test_acall_tool_with_data_result(mocked_call_tool, mcp_client: MCPClient) -> None:
     """Test tool call when result has data instead of content."""
-    client = MCPClient(command="python", args=["server.py"])
-
-    mock_result = MagicMock()
-    mock_result.content = None
-    mock_result.data = {"key": "value"}
+    mock_result = _tool_result(data={"key": "value"})
 
-    with mocked_mcp_client() as (mock_class, mock_instance):
-        mock_instance.call_tool = AsyncMock(return_value=mock_result)
-        result = await client.acall_tool("test_tool", {})
+    _, mock_call_tool = mocked_call_tool
+    mock_call_tool.return_value = mock_result
+    result = await mcp_client.acall_tool("test_tool", {})
 
     # Should serialize data to JSON
     assert isinstance(result, str)
@@ -242,42 +252,33 @@ async def test_acall_tool_with_data_result(mocked_mcp_client) -> None:
 
 
 @pytest.mark.asyncio
-async def test_acall_tool_empty_arguments(mocked_mcp_client) -> None:
+async def test_acall_tool_empty_arguments(mocked_call_tool, mcp_client: MCPClient) -> None:
     """Test tool call with empty arguments."""
-    client = MCPClient(command="python", args=["server.py"])
+    mock_result = _tool_result(text="Success")
 
-    mock_content = MagicMock()
-    mock_content.text = "Success"
-    mock_result = MagicMock()
-    mock_result.content = [mock_content]
-
-    with mocked_mcp_client() as (mock_class, mock_instance):
-        mock_instance.call_tool = AsyncMock(return_value=mock_result)
-        result = await client.acall_tool("test_tool", {})
+    _, mock_call_tool = mocked_call_tool
+    mock_call_tool.return_value = mock_result
+    result = await mcp_client.acall_tool("test_tool", {})
 
     assert result == "Success"
 
 
 @pytest.mark.asyncio
-async def test_acall_tool_cancellation(mocked_mcp_client) -> None:
+async def test_acall_tool_cancellation(mocked_mcp_client, mcp_client: MCPClient) -> None:
     """Test tool call handles cancellation."""
-    client = MCPClient(command="python", args=["server.py"])
-
     with mocked_mcp_client() as (mock_class, mock_instance):
         mock_instance.__aenter__ = AsyncMock(side_effect=asyncio.CancelledError("Cancelled"))
         with pytest.raises(asyncio.CancelledError):
-            await client.acall_tool("test_tool", {})
+            await mcp_client.acall_tool("test_tool", {})
 
 
 @pytest.mark.asyncio
-async def test_acall_tool_keyboard_interrupt(mocked_mcp_client) -> None:
+async def test_acall_tool_keyboard_interrupt(mocked_mcp_client, mcp_client: MCPClient) -> None:
     """Test tool call propagates KeyboardInterrupt."""
-    client = MCPClient(command="python", args=["server.py"])
-
     with mocked_mcp_client() as (mock_class, mock_instance):
         mock_instance.__aenter__ = AsyncMock(side_effect=KeyboardInterrupt("User interrupted"))
         with pytest.raises(KeyboardInterrupt):
-            await client.acall_tool("test_tool", {})
+            await mcp_client.acall_tool("test_tool", {})
 
 
 # ============================================================================
@@ -285,27 +286,23 @@ async def test_acall_tool_keyboard_interrupt(mocked_mcp_client) -> None:
 # ============================================================================
 
 
-def test_call_tool_success() -> None:
+def test_call_tool_success(mcp_client: MCPClient) -> None:
     """Test synchronous tool call."""
-    client = MCPClient(command="python", args=["server.py"])
-
-    with patch.object(client, "acall_tool", new_callable=AsyncMock) as mock_acall:
+    with patch.object(mcp_client, "acall_tool", new_callable=AsyncMock) as mock_acall:
         mock_acall.return_value = "Tool result"
 
-        result = client.call_tool("test_tool", {"param": "value"})
+        result = mcp_client.call_tool("test_tool", {"param": "value"})
 
     assert result == "Tool result"
 
 
-def test_call_tool_keyboard_interrupt() -> None:
+def test_call_tool_keyboard_interrupt(mcp_client: MCPClient) -> None:
     """Test that KeyboardInterrupt is propagated."""
-    client = MCPClient(command="python", args=["server.py"])
-
-    with patch.object(client, "acall_tool", new_callable=AsyncMock) as mock_acall:
+    with patch.object(mcp_client, "acall_tool", new_callable=AsyncMock) as mock_acall:
         mock_acall.side_effect = KeyboardInterrupt()
 
         with pytest.raises(KeyboardInterrupt):
-            client.call_tool("test_tool", {})
+            mcp_client.call_tool("test_tool", {})
 
 
 # ============================================================================
@@ -317,19 +314,17 @@ def test_call_tool_keyboard_interrupt() -> None:
 async def test_progress_handler_with_callback(mcp_client_with_callback: MCPClient) -> None:
     """Test that progress callback is called."""
     # Call the progress handler
-    await mcp_client_with_callback._MCPClient__progress_handler(50, 100, "Processing...")
+    await mcp_client_with_callback._progress_handler(50, 100, "Processing...")
 
     # Verify callback was called
     mcp_client_with_callback.progress_callback.assert_called_once_with(50, 100, "Processing...")
 
 
 @pytest.mark.asyncio
-async def test_progress_handler_without_callback() -> None:
+async def test_progress_handler_without_callback(mcp_client: MCPClient) -> None:
     """Test progress handler works without callback."""
-    client = MCPClient(command="python", args=["server.py"])
-
     # Should not raise
-    await client._MCPClient__progress_handler(50, 100, "Processing...")
+    await mcp_client._progress_handler(50, 100, "Processing...")
 
 
 # ============================================================================
@@ -338,19 +333,14 @@ async def test_progress_handler_without_callback() -> None:
 
 
 @pytest.mark.asyncio
-async def test_acall_tool_with_invalid_schema(mocked_mcp_client) -> None:
+async def test_acall_tool_with_invalid_schema(mocked_call_tool, mcp_client: MCPClient) -> None:
     """Test tool call handles invalid schema gracefully."""
-    client = MCPClient(command="python", args=["server.py"])
-
     # Tool with invalid schema should still work if call succeeds
-    mock_content = MagicMock()
-    mock_content.text = "Success despite invalid schema"
-    mock_result = MagicMock()
-    mock_result.content = [mock_content]
+    mock_result = _tool_result(text="Success despite invalid schema")
 
-    with mocked_mcp_client() as (mock_class, mock_instance):
-        mock_instance.call_tool = AsyncMock(return_value=mock_result)
-        result = await client.acall_tool("test_tool", {"invalid": "args"})
+    _, mock_call_tool = mocked_call_tool
+    mock_call_tool.return_value = mock_result
+    result = await mcp_client.acall_tool("test_tool", {"invalid": "args"})
 
     assert result == "Success despite invalid schema"
 
@@ -368,76 +358,65 @@ def test_mcp_client_timeout_configuration() -> None:
 
 
 @pytest.mark.asyncio
-async def test_connect_opens_persistent_connection(mocked_mcp_client) -> None:
+async def test_connect_opens_persistent_connection(
+    mocked_mcp_client, mcp_client: MCPClient
+) -> None:
     """Test that connect() opens and stores a persistent connection."""
-    client = MCPClient(command="python", args=["server.py"])
-
-    assert client._client is None
-    assert client._transport is None
+    assert mcp_client._client is None
+    assert mcp_client._transport is None
 
     with mocked_mcp_client() as (mock_class, mock_instance):
-        await client.connect()
+        await mcp_client.connect()
 
-    assert client._client is not None
-    assert client._transport is not None
+    assert mcp_client._client is not None
+    assert mcp_client._transport is not None
 
 
 @pytest.mark.asyncio
-async def test_connect_is_idempotent(mocked_mcp_client) -> None:
+async def test_connect_is_idempotent(mocked_mcp_client, mcp_client: MCPClient) -> None:
     """Test that calling connect() twice does not create a second connection."""
-    client = MCPClient(command="python", args=["server.py"])
-
     with mocked_mcp_client() as (mock_class, mock_instance):
-        await client.connect()
-        first_client = client._client
+        await mcp_client.connect()
+        first_client = mcp_client._client
 
         # Second call should be a no-op
-        await client.connect()
-        assert client._client is first_client
+        await mcp_client.connect()
+        assert mcp_client._client is first_client
 
 
 @pytest.mark.asyncio
-async def test_disconnect_clears_state(mocked_mcp_client) -> None:
+async def test_disconnect_clears_state(mocked_mcp_client, mcp_client: MCPClient) -> None:
     """Test that disconnect() clears transport and client state."""
-    client = MCPClient(command="python", args=["server.py"])
-
     with mocked_mcp_client() as (mock_class, mock_instance):
-        await client.connect()
-        assert client._client is not None
+        await mcp_client.connect()
+        assert mcp_client._client is not None
 
-        await client.disconnect()
+        await mcp_client.disconnect()
 
-    assert client._client is None
-    assert client._transport is None
+    assert mcp_client._client is None
+    assert mcp_client._transport is None
 
 
 @pytest.mark.asyncio
-async def test_disconnect_without_connect() -> None:
+async def test_disconnect_without_connect(mcp_client: MCPClient) -> None:
     """Test that disconnect() is safe to call without connect()."""
-    client = MCPClient(command="python", args=["server.py"])
-
     # Should not raise
-    await client.disconnect()
-    assert client._client is None
+    await mcp_client.disconnect()
+    assert mcp_client._client is None
 
 
 @pytest.mark.asyncio
-async def test_persistent_alist_tools(mocked_mcp_client) -> None:
+async def test_persistent_alist_tools(mocked_mcp_client, mcp_client: MCPClient) -> None:
     """Test that alist_tools() reuses persistent connection when connected."""
-    client = MCPClient(command="python", args=["server.py"])
-
-    mock_tool = MagicMock()
-    mock_tool.name = "persistent_tool"
-    mock_tool.description = "A tool"
-    mock_tool.inputSchema = {"type": "object", "properties": {}}
+    mock_tool = _tool("persistent_tool", "A tool", {"type": "object", "properties": {}})
 
     with mocked_mcp_client() as (mock_class, mock_instance):
         mock_instance.list_tools = AsyncMock(return_value=[mock_tool])
-        await client.connect()
+        await mcp_client.connect()
 
         # alist_tools should use the persistent client (no new Client created)
         initial_call_count = mock_class.call_count
-        tools = await client.alist_tools()
+        tools = await mcp_client.alist_tools()
         assert mock_class.call_count == initial_call_count  # no new Client
 
     assert len(tools) == 1
@@ -445,40 +424,32 @@ async def test_persistent_alist_tools(mocked_mcp_client) -> None:
 
 
 @pytest.mark.asyncio
-async def test_persistent_acall_tool(mocked_mcp_client) -> None:
+async def test_persistent_acall_tool(mocked_call_tool, mcp_client: MCPClient) -> None:
     """Test that acall_tool() reuses persistent connection when connected."""
-    client = MCPClient(command="python", args=["server.py"])
+    mock_result = _tool_result(text="Persistent result")
 
-    mock_content = MagicMock()
-    mock_content.text = "Persistent result"
-    mock_result = MagicMock()
-    mock_result.content = [mock_content]
-
-    with mocked_mcp_client() as (mock_class, mock_instance):
-        mock_instance.call_tool = AsyncMock(return_value=mock_result)
-        await client.connect()
+    mock_class, mock_call_tool = mocked_call_tool
+    mock_call_tool.return_value = mock_result
+    await mcp_client.connect()
 
-        initial_call_count = mock_class.call_count
-        result = await client.acall_tool("test_tool", {"key": "val"})
-        assert mock_class.call_count == initial_call_count  # no new Client
+    initial_call_count = mock_class.call_count
+    result = await mcp_client.acall_tool("test_tool", {"key": "val"})
+    assert mock_class.call_count == initial_call_count  # no new Client
 
     assert result == "Persistent result"
 
 
 @pytest.mark.asyncio
-async def test_persistent_alist_tools_recovers_on_failure(mocked_mcp_client) -> None:
-    """Test that alist_tools() falls back to temp connection when persistent client dies."""
-    client = MCPClient(command="python", args=["server.py"])
-
-    mock_tool = MagicMock()
-    mock_tool.name = "recovered_tool"
-    mock_tool.description = "A tool"
-    mock_tool.inputSchema = {"type": "object", "properties": {}}
+async def test_persistent_alist_tools_recovers_on_failure(
+    mocked_mcp_client, mcp_client: MCPClient
+) -> None:
+    """Test that alist_tools() reconnects when the persistent client dies."""
+    mock_tool = _tool("recovered_tool", "A tool", {"type": "object", "properties": {}})
 
     with mocked_mcp_client() as (mock_class, mock_instance):
         # First: connect successfully
-        await client.connect()
-        assert client._client is not None
+        await mcp_client.connect()
+        assert mcp_client._client is not None
 
         # Simulate subprocess death: list_tools raises on persistent client
         call_count = 0
@@ -492,28 +463,26 @@ async def test_persistent_alist_tools_recovers_on_failure(mocked_mcp_client) ->
 
         mock_instance.list_tools = list_tools_side_effect
 
-        # Should recover via temp connection fallback
-        tools = await client.alist_tools()
+        # Should recover via a fresh persistent connection
+        tools = await mcp_client.alist_tools()
+        assert mock_class.call_count == 2  # initial connect + one reconnect
 
-    # Persistent connection should have been torn down
-    assert client._client is None
+    mock_instance.__aexit__.assert_awaited_once()  # dead connection was closed
+    assert mcp_client._client is not None
     assert len(tools) == 1
     assert tools[0]["name"] == "recovered_tool"
 
 
 @pytest.mark.asyncio
-async def test_persistent_acall_tool_recovers_on_failure(mocked_mcp_client) -> None:
-    """Test that acall_tool() falls back to temp connection when persistent client dies."""
-    client = MCPClient(command="python", args=["server.py"])
-
-    mock_content = MagicMock()
-    mock_content.text = "Recovered result"
-    mock_result = MagicMock()
-    mock_result.content = [mock_content]
+async def test_persistent_acall_tool_recovers_on_failure(
+    mocked_mcp_client, mcp_client: MCPClient
+) -> None:
+    """Test that acall_tool() reconnects when the persistent client dies."""
+    mock_result = _tool_result(text="Recovered result")
 
     with mocked_mcp_client() as (mock_class, mock_instance):
-        await client.connect()
-        assert client._client is not None
+        await mcp_client.connect()
+        assert mcp_client._client is not None
 
         call_count = 0
 
@@ -526,41 +495,300 @@ async def test_persistent_acall_tool_recovers_on_failure(mocked_mcp_client) -> N
 
         mock_instance.call_tool = call_tool_side_effect
 
-        result = await client.acall_tool("test_tool", {"key": "val"})
+        result = await mcp_client.acall_tool("test_tool", {"key": "val"})
+        assert mock_class.call_count == 2  # initial connect + one reconnect
 
-    assert client._client is None
+    assert mcp_client._client is not None
     assert result == "Recovered result"
 
 
 @pytest.mark.asyncio
-async def test_persistent_acall_tool_propagates_non_transport_error(mocked_mcp_client) -> None:
-    """Test that non-transport errors on persistent path propagate without retry."""
-    client = MCPClient(command="python", args=["server.py"])
+async def test_concurrent_failures_reconnect_once(mocked_mcp_client, mcp_client: MCPClient) -> None:
+    """Test that calls failing together on a dead connection share one reconnect."""
+    with mocked_mcp_client() as (mock_class, mock_instance):
+        mock_class.side_effect = lambda *args, **kwargs: AsyncMock()
+        await mcp_client.connect()
+        dead = mcp_client._client
+
+        async def call_tool_with(pooled_client, name, arguments):
+            if pooled_client is dead:
+                await asyncio.sleep(0)  # let every call reach the dead connection
+                raise ConnectionError("subprocess died")
+            return "ok"
+
+        with patch.object(MCPClient, "_call_tool_with", side_effect=call_tool_with):
+            results = await asyncio.gather(*(mcp_client.acall_tool("t", {}) for _ in range(10)))
 
+        assert mock_class.call_count == 2  # initial connect + a single reconnect
+
+    assert results == ["ok"] * 10
+    assert mcp_client._client is not dead
+    dead.__aexit__.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_failed_reconnect_backs_off(mocked_mcp_client, mcp_client: MCPClient) -> None:
+    """Test that a failed reconnect is not retried until the backoff expires."""
+    with mocked_mcp_client() as (mock_class, mock_instance):
+        await mcp_client.connect()
+        mock_instance.call_tool = AsyncMock(side_effect=ConnectionError("subprocess died"))
+        mock_instance.__aenter__ = AsyncMock(side_effect=OSError("spawn failed"))
+
+        with pytest.raises(OSError):
+            await mcp_client.acall_tool("test_tool", {})
+        attempts = mock_class.call_count
+
+        # Within the backoff window the next call goes straight to a temporary connection
+        with pytest.raises(OSError):
+            await mcp_client.acall_tool("test_tool", {})
+
+    assert attempts == 3  # connect + failed reconnect + temporary connection
+    assert mock_class.call_count == attempts + 1
+    assert mcp_client._reconnect_failures == 1
+
+
+@pytest.mark.asyncio
+async def test_pool_refilled_after_backoff(mocked_mcp_client, mcp_client: MCPClient) -> None:
+    """Test that a call after the backoff window reopens the pool a failed reconnect left empty."""
+    with mocked_mcp_client() as (mock_class, mock_instance):
+        await mcp_client.connect()
+        mock_instance.call_tool = AsyncMock(side_effect=ConnectionError("subprocess died"))
+        mock_instance.__aenter__ = AsyncMock(side_effect=OSError("spawn failed"))
+
+        with pytest.raises(OSError):
+            await mcp_client.acall_tool("test_tool", {})
+        assert mcp_client._connections == []
+
+        # The server is back; move the clock past the backoff window
+        mock_instance.__aenter__ = AsyncMock(return_value=mock_instance)
+        mock_instance.call_tool = AsyncMock(return_value=_tool_result(text="ok"))
+        loop = asyncio.get_running_loop()
+        real_time = loop.time
+        with patch.object(loop, "time", side_effect=lambda: real_time() + RECONNECT_BACKOFF_MAX):
+            result = await mcp_client.acall_tool("test_tool", {})
+        calls_after_refill = mock_class.call_count
+
+        # Later calls reuse the refilled pool instead of spawning per call
+        await mcp_client.acall_tool("test_tool", {})
+
+    assert result == "ok"
+    assert len(mcp_client._connections) == mcp_client.pool_size
+    assert mcp_client._reconnect_failures == 0
+    assert mock_class.call_count == calls_after_refill
+
+
+@pytest.mark.asyncio
+async def test_transport_failure_retried_once(mocked_mcp_client, mcp_client: MCPClient) -> None:
+    """Test that a call whose transport keeps failing is sent at most twice."""
+    sent = 0
+
+    async def call_tool_with(pooled_client, name, arguments):
+        nonlocal sent
+        sent += 1
+        raise ConnectionError("subprocess died")
+
+    with mocked_mcp_client():
+        await mcp_client.connect()
+        with (
+            patch.object(MCPClient, "_call_tool_with", side_effect=call_tool_with),
+            pytest.raises(ConnectionError),
+        ):
+            await mcp_client.acall_tool("test_tool", {})
+
+    assert sent == 2
+
+
+def test_reconnect_lock_created_per_event_loop(mcp_client: MCPClient) -> None:
+    """Test that each asyncio.run() loop gets its own reconnect lock."""
+
+    async def get_lock():
+        return mcp_client._get_reconnect_lock()
+
+    assert mcp_client._primitives is None
+    first = asyncio.run(get_lock())
+    second = asyncio.run(get_lock())
+
+    assert first is not second
+
+
+@pytest.mark.asyncio
+async def test_persistent_acall_tool_propagates_non_transport_error(
+    mocked_mcp_client, mcp_client: MCPClient
+) -> None:
+    """Test that non-transport errors on persistent path propagate without retry."""
     with mocked_mcp_client() as (mock_class, mock_instance):
         mock_instance.call_tool = AsyncMock(side_effect=ValueError("bad tool argument"))
-        await client.connect()
-        assert client._client is not None
+        await mcp_client.connect()
+        assert mcp_client._client is not None
 
         with pytest.raises(ValueError, match="bad tool argument"):
-            await client.acall_tool("test_tool", {"key": "val"})
+            await mcp_client.acall_tool("test_tool", {"key": "val"})
 
         # Persistent connection should still be intact (not torn down)
-        assert client._client is not None
+        assert mcp_client._client is not None
 
 
 @pytest.mark.asyncio
-async def test_persistent_alist_tools_propagates_non_transport_error(mocked_mcp_client) -> None:
+async def test_persistent_alist_tools_propagates_non_transport_error(
+    mocked_mcp_client, mcp_client: MCPClient
+) -> None:
     """Test that non-transport errors on persistent path propagate without retry."""
-    client = MCPClient(command="python", args=["server.py"])
-
     with mocked_mcp_client() as (mock_class, mock_instance):
         mock_instance.list_tools = AsyncMock(side_effect=ValueError("bad schema"))
-        await client.connect()
-        assert client._client is not None
+        await mcp_client.connect()
+        assert mcp_client._client is not None
 
         with pytest.raises(ValueError, match="bad schema"):
-            await client.alist_tools()
+            await mcp_client.alist_tools()
 
         # Persistent connection should still be intact (not torn down)
-        assert client._client is not None
+        assert mcp_client._client is not None
+
+
+# ============================================================================
+# Tests: Connection Pool
+# ============================================================================
+
+
+@pytest.mark.asyncio
+async def test_connect_opens_pool_size_connections(mocked_mcp_client) -> None:
+    """Test that connect() opens one client per pool slot, and only once."""
+    client = MCPClient(command="python", args=["server.py"], pool_size=3)
+
+    with mocked_mcp_client() as (mock_class, mock_instance):
+        await client.connect()
+        await client.connect()
+
+    assert client.pool_size == 3
+    assert mock_class.call_count == 3
+    assert len(client._connections) == 3
+
+
+@pytest.mark.asyncio
+async def test_pool_spreads_calls_round_robin(mocked_mcp_client) -> None:
+    """Test that consecutive calls use each pooled connection in turn."""
+    client = MCPClient(command="python", args=["server.py"], pool_size=2)
+    used: list[object] = []
+
+    with mocked_mcp_client() as (mock_class, mock_instance):
+        await client.connect()
+        first, second = (Mock(), Mock()), (Mock(), Mock())
+        client._connections = [first, second]
+
+        async def call_tool_with(pooled_client, name, arguments):
+            used.append(pooled_client)
+            return "ok"
+
+        with patch.object(MCPClient, "_call_tool_with", side_effect=call_tool_with):
+            for _ in range(4):
+                await client.acall_tool("test_tool", {})
+
+    assert used == [first[0], second[0], first[0], second[0]]
+
+
+@pytest.mark.asyncio
+async def test_pool_evicts_only_failed_connection(mocked_mcp_client) -> None:
+    """Test that a transport error drops one connection and retries on another."""
+    client = MCPClient(command="python", args=["server.py"], pool_size=2)
+
+    with mocked_mcp_client() as (mock_class, mock_instance):
+        await client.connect()
+        dead, alive = (AsyncMock(), Mock()), (AsyncMock(), Mock())
+        client._connections = [dead, alive]
+
+        async def call_tool_with(pooled_client, name, arguments):
+            if pooled_client is dead[0]:
+                raise ConnectionError("subprocess died")
+            return "ok"
+
+        with patch.object(MCPClient, "_call_tool_with", side_effect=call_tool_with):
+            result = await client.acall_tool("test_tool", {})
+
+    assert result == "ok"
+    assert dead not in client._connections
+    assert alive in client._connections
+    assert len(client._connections) == 2  # the dead slot was refilled
+    dead[0].__aexit__.assert_awaited_once()
+    # Two initial connections + one replacement; no temporary connection was needed
+    assert mock_class.call_count == 3
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("pool_size", [1, 2], ids=["default_pool", "pool_of_two"])
+async def test_acall_tools_concurrent(mocked_mcp_client, pool_size) -> None:
+    """Test that batched calls all overlap, whatever the pool size, and keep their order."""
+    client = MCPClient(command="python", args=["server.py"], pool_size=pool_size)
+    calls = [(f"tool_{i}", {"i": i}) for i in range(4)]
+    in_flight = 0
+    max_in_flight = 0
+
+    async def call_tool_with(pooled_client, name, arguments):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.05)
+        in_flight -= 1
+        return name
+
+    with mocked_mcp_client():
+        await client.connect()
+        with patch.object(MCPClient, "_call_tool_with", side_effect=call_tool_with):
+            results = await client.acall_tools(calls)
+
+    assert results == [name for name, _ in calls]
+    assert max_in_flight == len(calls)
+
+
+@pytest.mark.asyncio
+async def test_acall_tools_bounds_temporary_connections(mocked_mcp_client) -> None:
+    """Test that a batch without a pool spawns at most MAX_TEMPORARY_CONNECTIONS servers."""
+    client = MCPClient(command="python", args=["server.py"])
+    calls = [(f"tool_{i}", {}) for i in range(MAX_TEMPORARY_CONNECTIONS * 3)]
+    in_flight = 0
+    max_in_flight = 0
+
+    async def call_tool_with(temporary_client, name, arguments):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return name
+
+    with (
+        mocked_mcp_client() as (mock_class, mock_instance),
+        patch.object(MCPClient, "_call_tool_with", side_effect=call_tool_with),
+    ):
+        results = await client.acall_tools(calls)
+
+    assert results == [name for name, _ in calls]
+    assert max_in_flight == MAX_TEMPORARY_CONNECTIONS
+    assert mock_class.call_count == len(calls)  # one temporary connection per call
+
+
+@pytest.mark.asyncio
+async def test_acall_tools_cancels_remaining_calls_on_failure(mocked_mcp_client) -> None:
+    """Test that a failing call cancels and awaits its siblings instead of orphaning them."""
+    client = MCPClient(command="python", args=["server.py"])
+    sibling_cancelled = asyncio.Event()
+
+    async def call_tool_with(pooled_client, name, arguments):
+        if name == "bad":
+            raise ValueError("bad tool argument")
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            sibling_cancelled.set()
+            raise
+        return name
+
+    with mocked_mcp_client():
+        await client.connect()
+        with (
+            patch.object(MCPClient, "_call_tool_with", side_effect=call_tool_with),
+            pytest.raises(ExceptionGroup) as excinfo,
+        ):
+            await client.acall_tools([("slow", {}), ("bad", {})])
+
+    assert excinfo.group_contains(ValueError, match="bad tool argument")
+    assert sibling_cancelled.is_set()
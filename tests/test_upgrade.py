@@ -8,6 +8,7 @@ Verifies auto-upgrade functionality:
 
 from __future__ import annotations
 
+import os
 import subprocess
 import sys
 from pathlib import Path
@@ -16,7 +17,9 @@ from unittest.mock import MagicMock, patch
 import pytest
 
 from donkit_ragops.upgrade import (
+    UPGRADE_OUTPUT_TAIL_BYTES,
     InstallMethod,
+    _is_ragops_poetry_project,
     detect_install_method,
     format_upgrade_instructions,
     get_upgrade_command,
@@ -24,6 +27,14 @@ from donkit_ragops.upgrade import (
 )
 
 
+@pytest.fixture(autouse=True)
+def clear_pyproject_cache():
+    """Start each test with an empty pyproject.toml parse cache."""
+    _is_ragops_poetry_project.cache_clear()
+    yield
+    _is_ragops_poetry_project.cache_clear()
+
+
 # ============================================================================
 # Tests: Installation Method Detection
 # ============================================================================
@@ -88,6 +99,56 @@ requests = "^2.0.0"
         assert method == InstallMethod.PIP
 
 
+def test_detect_install_method_poetry_ignores_similar_package_names(tmp_path: Path) -> None:
+    """Test that packages merely prefixed with donkit-ragops are not a match."""
+    pyproject = tmp_path / "pyproject.toml"
+    pyproject.write_text(
+        """
+[tool.poetry]
+name = "test"
+
+[tool.poetry.dependencies]
+donkit-ragops-api-gateway-client = "^0.2.1"
+"""
+    )
+
+    with patch("donkit_ragops.upgrade.Path.cwd", return_value=tmp_path):
+        assert detect_install_method() == InstallMethod.PIP
+
+
+def test_detect_install_method_parses_unchanged_pyproject_once(tmp_path: Path) -> None:
+    """Test that pyproject.toml is re-parsed only after it changes."""
+    pyproject = tmp_path / "pyproject.toml"
+    pyproject.write_text('[tool.poetry.dependencies]\nrequests = "^2.0.0"\n')
+
+    with patch("donkit_ragops.upgrade.Path.cwd", return_value=tmp_path):
+        assert detect_install_method() == InstallMethod.PIP
+        misses = _is_ragops_poetry_project.cache_info().misses
+        assert detect_install_method() == InstallMethod.PIP
+        assert _is_ragops_poetry_project.cache_info().misses == misses
+
+        pyproject.write_text('[tool.poetry.dependencies]\ndonkit-ragops = "^0.5.0"\n')
+        stat = pyproject.stat()
+        os.utime(pyproject, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        assert detect_install_method() == InstallMethod.POETRY
+
+
+def test_detect_install_method_notices_rewrite_with_same_mtime(tmp_path: Path) -> None:
+    """Test that a rewrite within the same mtime tick is still picked up."""
+    pyproject = tmp_path / "pyproject.toml"
+    pyproject.write_text('[tool.poetry.dependencies]\nrequests = "^2.0.0"\n')
+    stat = pyproject.stat()
+
+    with patch("donkit_ragops.upgrade.Path.cwd", return_value=tmp_path):
+        assert detect_install_method() == InstallMethod.PIP
+
+        pyproject.write_text('[tool.poetry.dependencies]\ndonkit-ragops = "^0.5.0"\n')
+        os.utime(pyproject, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+        assert detect_install_method() == InstallMethod.POETRY
+
+
 # ============================================================================
 # Tests: Upgrade Command Generation
 # ============================================================================
@@ -122,68 +183,91 @@ def test_get_upgrade_command_unknown() -> None:
 # ============================================================================
 
 
-def test_run_upgrade_success() -> None:
+@pytest.fixture
+def patched_run():
+    """Patch subprocess.run for run_upgrade tests; configure its return value or side effect."""
+    with patch("subprocess.run") as mock_run:
+        yield mock_run
+
+
+def _completed(returncode: int = 0, stdout: bytes = b"", stderr: bytes = b""):
+    """Build a finished subprocess.run result."""
+    return subprocess.CompletedProcess([], returncode, stdout=stdout, stderr=stderr)
+
+
+def test_run_upgrade_success(patched_run) -> None:
     """Test successful upgrade execution."""
-    mock_result = MagicMock()
-    mock_result.returncode = 0
-    mock_result.stdout = "Successfully upgraded donkit-ragops"
-    mock_result.stderr = ""
+    patched_run.return_value = _completed(stdout=b"Successfully upgraded donkit-ragops")
 
-    with patch("subprocess.run", return_value=mock_result) as mock_run:
-        success, output = run_upgrade(InstallMethod.PIP)
+    success, output = run_upgrade(InstallMethod.PIP)
 
-        assert success is True
-        assert "Successfully upgraded" in output
-        mock_run.assert_called_once()
+    assert success is True
+    assert "Successfully upgraded" in output
+    patched_run.assert_called_once()
 
 
-def test_run_upgrade_failure() -> None:
+def test_run_upgrade_failure(patched_run) -> None:
     """Test failed upgrade execution."""
-    mock_result = MagicMock()
-    mock_result.returncode = 1
-    mock_result.stdout = ""
-    mock_result.stderr = "Permission denied"
+    patched_run.return_value = _completed(returncode=1, stderr=b"Permission denied")
+
+    success, output = run_upgrade(InstallMethod.PIP)
+
+    assert success is False
+    assert "Permission denied" in output
 
-    with patch("subprocess.run", return_value=mock_result) as mock_run:
-        success, output = run_upgrade(InstallMethod.PIP)
 
-        assert success is False
-        assert "Permission denied" in output
+def test_run_upgrade_returns_output_tail(patched_run) -> None:
+    """Test that only the end of a long successful upgrade log is decoded and returned."""
+    noise = b"Collecting dependency...\n" * 10_000
+    patched_run.return_value = _completed(stdout=noise + b"Successfully installed donkit-ragops")
 
+    success, output = run_upgrade(InstallMethod.PIP)
 
-def test_run_upgrade_timeout() -> None:
-    """Test upgrade timeout handling."""
-    with patch("subprocess.run", side_effect=subprocess.TimeoutExpired("cmd", 300)):
-        success, output = run_upgrade(InstallMethod.PIP)
+    assert success is True
+    assert output.endswith("Successfully installed donkit-ragops")
+    assert len(output) <= UPGRADE_OUTPUT_TAIL_BYTES
+    assert "text" not in patched_run.call_args.kwargs
 
-        assert success is False
-        assert "timed out" in output.lower()
 
+def test_run_upgrade_failure_without_stderr(patched_run) -> None:
+    """Test that a failure with empty output still reports an error message."""
+    patched_run.return_value = _completed(returncode=1)
+
+    success, output = run_upgrade(InstallMethod.PIP)
+
+    assert success is False
+    assert output == "Unknown error"
+
+
+@pytest.mark.parametrize(
+    ("method", "error", "message"),
+    [
+        (InstallMethod.PIP, subprocess.TimeoutExpired("cmd", 300), "timed out"),
+        (InstallMethod.PIPX, FileNotFoundError("pipx not found"), "not found"),
+    ],
+    ids=["timeout", "command_not_found"],
+)
+def test_run_upgrade_error(patched_run, method, error, message) -> None:
+    """Test that a timeout or missing upgrade command is reported, not raised."""
+    patched_run.side_effect = error
 
-def test_run_upgrade_command_not_found() -> None:
-    """Test handling when upgrade command is not found."""
-    with patch("subprocess.run", side_effect=FileNotFoundError("pipx not found")):
-        success, output = run_upgrade(InstallMethod.PIPX)
+    success, output = run_upgrade(method)
 
-        assert success is False
-        assert "not found" in output.lower()
+    assert success is False
+    assert message in output.lower()
 
 
-def test_run_upgrade_auto_detect() -> None:
+def test_run_upgrade_auto_detect(patched_run) -> None:
     """Test upgrade with auto-detected installation method."""
-    mock_result = MagicMock()
-    mock_result.returncode = 0
-    mock_result.stdout = "Success"
-    mock_result.stderr = ""
+    patched_run.return_value = _completed(stdout=b"Success")
 
-    with patch("subprocess.run", return_value=mock_result):
-        with patch("donkit_ragops.upgrade.detect_install_method") as mock_detect:
-            mock_detect.return_value = InstallMethod.PIP
+    with patch("donkit_ragops.upgrade.detect_install_method") as mock_detect:
+        mock_detect.return_value = InstallMethod.PIP
 
-            success, output = run_upgrade(method=None)
+        success, output = run_upgrade(method=None)
 
-            assert success is True
-            mock_detect.assert_called_once()
+    assert success is True
+    mock_detect.assert_called_once()
 
 
 # ============================================================================
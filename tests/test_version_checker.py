@@ -10,39 +10,39 @@ Verifies version checking functionality:
 from __future__ import annotations
 
 import json
+import threading
 import time
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
+import httpx
 import pytest
 
 from donkit_ragops.version_checker import (
+    PYPI_CONNECT_RETRIES,
     VersionInfo,
     _compare_versions,
+    _ensure_dir,
     _get_cached_version_info,
-    _parse_version,
+    _get_http_client,
     _save_version_cache,
     check_for_updates,
+    check_for_updates_in_background,
+    close_version_check_client,
 )
 
 
-# ============================================================================
-# Tests: Version Parsing and Comparison
-# ============================================================================
-
-
-def test_parse_version_normal() -> None:
-    """Test parsing normal semantic version."""
-    assert _parse_version("0.5.1") == (0, 5, 1)
-    assert _parse_version("1.2.3") == (1, 2, 3)
-    assert _parse_version("10.20.30") == (10, 20, 30)
+@pytest.fixture(autouse=True)
+def clear_cache_dir_memo():
+    """Forget which cache directories were created, since tests patch CACHE_FILE."""
+    _ensure_dir.cache_clear()
+    yield
+    _ensure_dir.cache_clear()
 
 
-def test_parse_version_invalid() -> None:
-    """Test parsing invalid version strings."""
-    assert _parse_version("invalid") == (0, 0, 0)
-    assert _parse_version("") == (0, 0, 0)
-    assert _parse_version("1.2.x") == (0, 0, 0)
+# ============================================================================
+# Tests: Version Comparison
+# ============================================================================
 
 
 def test_compare_versions_newer() -> None:
@@ -63,6 +63,30 @@ def test_compare_versions_older() -> None:
     assert _compare_versions("1.0.0", "0.5.1") is False
 
 
+def test_compare_versions_pre_and_post_releases() -> None:
+    """Test that PEP 440 suffixes are ordered instead of treated as invalid."""
+    assert _compare_versions("0.6.0rc1", "0.6.0") is True
+    assert _compare_versions("0.6.0", "0.6.0rc1") is False
+    assert _compare_versions("0.5.1.dev1", "0.5.1") is True
+    assert _compare_versions("0.5.1", "0.5.1.post1") is True
+
+
+def test_compare_versions_invalid_is_not_outdated() -> None:
+    """Test that an unparseable version never triggers an update notice."""
+    assert _compare_versions("unknown", "0.5.2") is False
+    assert _compare_versions("0.5.1", "not-a-version") is False
+
+
+def test_compare_versions_memoized() -> None:
+    """Test that repeated comparisons are served from the cache."""
+    _compare_versions.cache_clear()
+
+    assert _compare_versions("0.5.1", "0.6.0") is True
+    assert _compare_versions("0.5.1", "0.6.0") is True
+
+    assert _compare_versions.cache_info().hits == 1
+
+
 # ============================================================================
 # Tests: Cache Management
 # ============================================================================
@@ -85,6 +109,21 @@ def test_save_and_get_cached_version_info(tmp_path: Path) -> None:
         assert cached.is_outdated is True
 
 
+def test_save_version_cache_creates_directory_once(tmp_path: Path) -> None:
+    """Test that the cache directory is created on first save only."""
+    cache_file = tmp_path / "nested" / "version_check.json"
+    version_info = VersionInfo(current="0.5.1", latest="0.5.2", is_outdated=True)
+
+    with patch("donkit_ragops.version_checker.CACHE_FILE", cache_file):
+        _save_version_cache(version_info)
+        _save_version_cache(version_info)
+
+        assert _get_cached_version_info() == version_info
+
+    assert _ensure_dir.cache_info().misses == 1
+    assert _ensure_dir.cache_info().hits == 1
+
+
 def test_get_cached_version_info_expired(tmp_path: Path) -> None:
     """Test that expired cache returns None."""
     cache_file = tmp_path / "version_check.json"
@@ -128,6 +167,41 @@ def test_get_cached_version_info_corrupted(tmp_path: Path) -> None:
         assert cached is None
 
 
+def test_get_cached_version_info_binary_garbage(tmp_path: Path) -> None:
+    """Test that a cache file with non-UTF-8 bytes returns None."""
+    cache_file = tmp_path / "version_check.json"
+    cache_file.write_bytes(b"\xff\xfe\x00garbage")
+
+    with patch("donkit_ragops.version_checker.CACHE_FILE", cache_file):
+        assert _get_cached_version_info() is None
+
+
+def test_save_version_cache_is_atomic(tmp_path: Path) -> None:
+    """Test that readers see a complete old or new cache while it is rewritten."""
+    cache_file = tmp_path / "version_check.json"
+    old = VersionInfo(current="0.5.1", latest="0.5.1", is_outdated=False)
+    new = VersionInfo(current="0.5.1", latest="0.5.2", is_outdated=True)
+    stop = threading.Event()
+
+    def writer() -> None:
+        while not stop.is_set():
+            _save_version_cache(new)
+            _save_version_cache(old)
+
+    with patch("donkit_ragops.version_checker.CACHE_FILE", cache_file):
+        _save_version_cache(old)
+        thread = threading.Thread(target=writer)
+        thread.start()
+        try:
+            seen = [_get_cached_version_info() for _ in range(500)]
+        finally:
+            stop.set()
+            thread.join()
+
+    assert all(info in (old, new) for info in seen)
+    assert list(tmp_path.iterdir()) == [cache_file]
+
+
 # ============================================================================
 # Tests: PyPI Integration
 # ============================================================================
@@ -182,6 +256,38 @@ def test_check_for_updates_fetch_failure() -> None:
         assert result is None
 
 
+def test_check_for_updates_reuses_http_client(tmp_path: Path) -> None:
+    """Test that repeated PyPI checks share one HTTP client."""
+    response = MagicMock()
+    response.json.return_value = {"info": {"version": "0.6.0"}}
+
+    with patch("donkit_ragops.version_checker.CACHE_FILE", tmp_path / "cache.json"):
+        with patch.object(httpx.Client, "get", autospec=True, return_value=response) as mock_get:
+            try:
+                check_for_updates("0.5.1", use_cache=False)
+                check_for_updates("0.5.1", use_cache=False)
+                shared_client = _get_http_client()
+            finally:
+                close_version_check_client()
+
+    assert mock_get.call_count == 2
+    assert [call.args[0] for call in mock_get.call_args_list] == [shared_client] * 2
+    assert shared_client.is_closed
+
+
+def test_http_client_retries_failed_connections() -> None:
+    """Test that the shared client's transport retries failed connection attempts."""
+    close_version_check_client()
+    with patch.object(httpx, "HTTPTransport", wraps=httpx.HTTPTransport) as mock_transport:
+        try:
+            _get_http_client()
+        finally:
+            close_version_check_client()
+
+    mock_transport.assert_called_once()
+    assert mock_transport.call_args.kwargs["retries"] == PYPI_CONNECT_RETRIES
+
+
 def test_check_for_updates_uses_cache(tmp_path: Path) -> None:
     """Test that check_for_updates uses cache when available."""
     cache_file = tmp_path / "version_check.json"
@@ -239,6 +345,64 @@ def test_check_for_updates_ignores_cache_when_version_changed(tmp_path: Path) ->
             assert result.latest == "0.5.3"
 
 
+def test_check_for_updates_in_background_does_not_wait_for_pypi(tmp_path: Path) -> None:
+    """Test that a stale cache is refreshed without blocking the caller."""
+    cache_file = tmp_path / "version_check.json"
+    release_fetch = threading.Event()
+    threads: list[threading.Thread] = []
+
+    def blocked_fetch() -> str:
+        release_fetch.wait(timeout=5)
+        return "0.6.0"
+
+    def record_thread(*args, **kwargs) -> threading.Thread:
+        thread = threading.Thread(*args, **kwargs)
+        threads.append(thread)
+        return thread
+
+    with (
+        patch("donkit_ragops.version_checker.CACHE_FILE", cache_file),
+        patch(
+            "donkit_ragops.version_checker._fetch_latest_version_from_pypi",
+            side_effect=blocked_fetch,
+        ),
+        patch("donkit_ragops.version_checker.threading") as mock_threading,
+    ):
+        mock_threading.Thread.side_effect = record_thread
+        try:
+            # Returns while the fetch is still blocked
+            result = check_for_updates_in_background("0.5.1")
+            assert result is None
+            assert threads[0].is_alive()
+        finally:
+            # Let the refresh finish before the cache path is unpatched
+            release_fetch.set()
+            for thread in threads:
+                thread.join(timeout=5)
+        assert not threads[0].is_alive()
+
+        # The refreshed cache is what the next invocation reads
+        cached = _get_cached_version_info()
+
+    assert cached == VersionInfo(current="0.5.1", latest="0.6.0", is_outdated=True)
+
+
+def test_check_for_updates_in_background_uses_fresh_cache(tmp_path: Path) -> None:
+    """Test that a fresh cache is returned without starting a PyPI request."""
+    cache_file = tmp_path / "version_check.json"
+    version_info = VersionInfo(current="0.5.1", latest="0.5.2", is_outdated=True)
+
+    with (
+        patch("donkit_ragops.version_checker.CACHE_FILE", cache_file),
+        patch("donkit_ragops.version_checker._fetch_latest_version_from_pypi") as mock_fetch,
+    ):
+        _save_version_cache(version_info)
+        result = check_for_updates_in_background("0.5.1")
+
+    assert result == version_info
+    mock_fetch.assert_not_called()
+
+
 # ============================================================================
 # Tests: Notification Display
 # ============================================================================
@@ -1,6 +1,19 @@
 """Tests for web application factory and browser opening functionality."""
 
-from unittest.mock import MagicMock, patch
+import threading
+from unittest.mock import DEFAULT, MagicMock, patch
+
+import pytest
+from fastapi import FastAPI
+
+from donkit_ragops.web.app import _get_browser_url, _open_browser, create_app
+from donkit_ragops.web.config import WebConfig
+
+
+@pytest.fixture(scope="module")
+def web_config():
+    """WebConfig shared by the app factory tests; create_app only reads it."""
+    return WebConfig(host="localhost", port=8067)
 
 
 class TestBrowserOpening:
@@ -8,87 +21,79 @@ class TestBrowserOpening:
 
     def test_get_browser_url_with_localhost(self):
         """Test that localhost remains localhost."""
-        from donkit_ragops.web.app import _get_browser_url
-
         result = _get_browser_url("localhost", 8067)
         assert result == "http://localhost:8067"
 
     def test_get_browser_url_with_0_0_0_0(self):
         """Test that 0.0.0.0 is converted to localhost."""
-        from donkit_ragops.web.app import _get_browser_url
-
         result = _get_browser_url("0.0.0.0", 8067)
         assert result == "http://localhost:8067"
 
     def test_get_browser_url_with_specific_ip(self):
         """Test that specific IPs are preserved."""
-        from donkit_ragops.web.app import _get_browser_url
-
         result = _get_browser_url("192.168.1.100", 8067)
         assert result == "http://192.168.1.100:8067"
 
-    @patch("donkit_ragops.web.app.webbrowser.open")
-    @patch("donkit_ragops.web.app.threading.Thread")
-    def test_open_browser_success(self, mock_thread, mock_webbrowser_open):
+    def test_open_browser_success(self):
         """Test that browser opens successfully with correct URL."""
-        from donkit_ragops.web.app import _open_browser
-
         # Create a mock thread instance
         mock_thread_instance = MagicMock()
-        mock_thread.return_value = mock_thread_instance
 
         test_url = "http://localhost:8067"
-        _open_browser(test_url, delay=0)
+        with patch.multiple(
+            "donkit_ragops.web.app", webbrowser=DEFAULT, threading=DEFAULT
+        ) as mocks:
+            mocks["threading"].Thread.return_value = mock_thread_instance
+            _open_browser(test_url, delay=0)
 
         # Verify thread was created and started
-        mock_thread.assert_called_once()
+        mocks["threading"].Thread.assert_called_once()
         mock_thread_instance.start.assert_called_once()
 
-    @patch("donkit_ragops.web.app.webbrowser.open")
-    @patch("donkit_ragops.web.app.time.sleep")
-    @patch("donkit_ragops.web.app.logger")
-    def test_open_browser_failure(self, mock_logger, mock_sleep, mock_webbrowser_open):
+    def test_open_browser_failure(self):
         """Test that browser opening failure is handled gracefully."""
-        from donkit_ragops.web.app import _open_browser
+        # Only the app module's threading name is patched; start real threads
+        # through it so the test can wait for them to finish
+        threads = []
 
-        # Make webbrowser.open raise an exception
-        mock_webbrowser_open.side_effect = Exception("Browser not found")
+        def record_thread(*args, **kwargs):
+            thread = threading.Thread(*args, **kwargs)
+            threads.append(thread)
+            return thread
 
         test_url = "http://localhost:8067"
-        _open_browser(test_url, delay=0)
-
-        # Wait for thread to complete
-        import time
-
-        time.sleep(0.1)
+        with patch.multiple(
+            "donkit_ragops.web.app",
+            webbrowser=DEFAULT,
+            time=DEFAULT,
+            logger=DEFAULT,
+            threading=DEFAULT,
+        ) as mocks:
+            # Make webbrowser.open raise an exception
+            mocks["webbrowser"].open.side_effect = Exception("Browser not found")
+            mocks["threading"].Thread.side_effect = record_thread
+            _open_browser(test_url, delay=0)
+
+            threads[0].join(timeout=1.0)
+
+        assert not threads[0].is_alive()
 
         # Should log warning but not crash
-        mock_logger.warning.assert_called()
+        mocks["logger"].warning.assert_called()
 
-    def test_create_app_returns_fastapi_instance(self):
+    def test_create_app_returns_fastapi_instance(self, web_config):
         """Test that create_app returns a FastAPI instance."""
-        from fastapi import FastAPI
-
-        from donkit_ragops.web.app import create_app
-        from donkit_ragops.web.config import WebConfig
-
-        config = WebConfig(host="localhost", port=8067)
-        app = create_app(config)
+        app = create_app(web_config)
 
         assert isinstance(app, FastAPI)
-        assert app.state.config == config
+        assert app.state.config == web_config
 
-    def test_create_app_registers_routes(self):
+    def test_create_app_registers_routes(self, web_config):
         """Test that create_app registers all expected routes."""
-        from donkit_ragops.web.app import create_app
-        from donkit_ragops.web.config import WebConfig
-
-        config = WebConfig(host="localhost", port=8067)
-        app = create_app(config)
+        app = create_app(web_config)
 
-        # Check that routes are registered
-        route_paths = [route.path for route in app.routes]
+        # Check that routes are registered; mounts may not expose a path
+        route_paths = frozenset(getattr(route, "path", None) for route in app.routes)
 
         # Health routes should be present
-        assert "/health" in route_paths
-        assert "/health/ready" in route_paths
+        assert {"/health", "/health/ready"} <= route_paths
@@ -1,10 +1,10 @@
 """Tests for file service."""
 
-import tempfile
+import io
 from pathlib import Path
-from unittest.mock import AsyncMock, MagicMock
 
 import pytest
+from fastapi import UploadFile
 
 from donkit_ragops.web.services.file_service import FileService
 from donkit_ragops.web.session.models import WebSession
@@ -17,15 +17,13 @@ def file_service():
 
 
 @pytest.fixture
-def temp_session():
+def temp_session(tmp_path: Path):
     """Create a session with temp directory."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        session = WebSession(
-            id="test-session",
-            provider_name="openai",
-            files_dir=Path(tmpdir),
-        )
-        yield session
+    return WebSession(
+        id="test-session",
+        provider_name="openai",
+        files_dir=tmp_path,
+    )
 
 
 class TestFileService:
@@ -37,23 +35,62 @@ class TestFileService:
         assert service._max_size_bytes == 50 * 1024 * 1024
 
     @pytest.mark.asyncio
-    async def test_list_files_empty(self, file_service, temp_session):
-        """Test listing files in empty directory."""
-        files = await file_service.list_files(temp_session)
-        assert files == []
+    @pytest.mark.parametrize("filename", ["notes.txt", "notes..v2.txt", "..notes"])
+    async def test_upload_file(self, file_service, temp_session, filename):
+        """Test uploading writes the file under the session's files dir."""
+        upload = UploadFile(io.BytesIO(b"hello"), filename=filename)
+
+        result = await file_service.upload_file(temp_session, upload)
+
+        assert result["size"] == 5
+        assert (temp_session.files_dir / filename).read_bytes() == b"hello"
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "filename",
+        [
+            "..",
+            "../../../etc/passwd",
+            "foo/../bar",
+            "x/../..",
+            "..\\evil.txt",
+            "/abs.txt",
+            "C:\\x.txt",
+            "C:x.txt",
+            "C:/x.txt",
+        ],
+    )
+    async def test_upload_file_path_traversal_blocked(
+        self, file_service, temp_session, filename
+    ):
+        """Test names that would escape the session's files dir are rejected."""
+        upload = UploadFile(io.BytesIO(b"data"), filename=filename)
+
+        with pytest.raises(ValueError, match="Invalid file name"):
+            await file_service.upload_file(temp_session, upload)
+
+        assert list(temp_session.files_dir.iterdir()) == []
 
     @pytest.mark.asyncio
-    async def test_list_files_with_files(self, file_service, temp_session):
-        """Test listing files returns correct info."""
-        # Create a test file
-        test_file = temp_session.files_dir / "test.txt"
-        test_file.write_text("hello world")
+    @pytest.mark.parametrize(
+        ("contents", "expected"),
+        [
+            ({}, []),
+            ({"test.txt": b"hello world"}, [("test.txt", 11)]),
+            ({"a.txt": b"a", "nested/b.txt": b"bb"}, [("a.txt", 1)]),
+        ],
+        ids=["empty", "one_file", "skips_subdirectories"],
+    )
+    async def test_list_files(self, file_service, temp_session, contents, expected):
+        """Test listing files returns the name and byte size of each top-level file."""
+        for name, data in contents.items():
+            path = temp_session.files_dir / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(data)
 
         files = await file_service.list_files(temp_session)
 
-        assert len(files) == 1
-        assert files[0]["name"] == "test.txt"
-        assert files[0]["size"] == 11  # "hello world" is 11 bytes
+        assert sorted((f["name"], f["size"]) for f in files) == expected
 
     @pytest.mark.asyncio
     async def test_list_files_no_directory(self, file_service):
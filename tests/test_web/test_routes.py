@@ -1,53 +1,66 @@
 """Tests for web API routes."""
 
+import httpx
 import pytest
-from unittest.mock import AsyncMock, MagicMock, patch
-
-from fastapi.testclient import TestClient
+import pytest_asyncio
+from unittest.mock import MagicMock, patch
 
 from donkit_ragops.web.app import create_app
 from donkit_ragops.web.config import WebConfig
-from donkit_ragops.web.session.models import SessionInfo, WebSession
 
 
-@pytest.fixture
-def test_config():
-    """Create test configuration."""
+@pytest.fixture(scope="module")
+def test_config(tmp_path_factory):
+    """Create test configuration.
+
+    Uploads go to a pytest temp directory, which is unique per xdist worker,
+    so parallel runs never share ./test_uploads in the working directory.
+    """
     return WebConfig(
         host="127.0.0.1",
         port=8001,
-        upload_dir="./test_uploads",
+        upload_dir=str(tmp_path_factory.mktemp("uploads")),
         session_ttl_seconds=60,
     )
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def app(test_config):
     """Create test app."""
     return create_app(test_config)
 
 
-@pytest.fixture
-def client(app):
-    """Create test client."""
-    with TestClient(app) as c:
-        yield c
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
+async def client(app):
+    """Create test client.
+
+    Shared by the whole module: building the app and running its lifespan
+    dominates these tests. Tests that need to change app state should open
+    their own client instead. Requests go straight to the ASGI app on the
+    test's event loop, so the lifespan is entered explicitly here.
+    """
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+            yield c
 
 
 class TestHealthRoutes:
     """Tests for health check endpoints."""
 
-    def test_health_returns_ok(self, client):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_health_returns_ok(self, client):
         """Test /health returns ok status."""
-        response = client.get("/health")
+        response = await client.get("/health")
 
         assert response.status_code == 200
         data = response.json()
         assert data["status"] == "ok"
 
-    def test_health_ready_returns_status(self, client):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_health_ready_returns_status(self, client):
         """Test /health/ready returns ready status."""
-        response = client.get("/health/ready")
+        response = await client.get("/health/ready")
 
         assert response.status_code == 200
         data = response.json()
@@ -59,7 +72,8 @@ class TestSessionRoutes:
     """Tests for session management endpoints."""
 
     @pytest.mark.skip(reason="Integration test - requires LLM provider configuration")
-    def test_create_session_with_defaults(self, client):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_create_session_with_defaults(self, client):
         """Test creating a session with default settings."""
         with patch(
             "donkit_ragops.web.session.manager.get_provider"
@@ -69,7 +83,7 @@ class TestSessionRoutes:
             # Mock the provider
             mock_provider.return_value = MagicMock()
 
-            response = client.post("/api/v1/sessions", json={})
+            response = await client.post("/api/v1/sessions", json={})
 
             assert response.status_code == 200
             data = response.json()
@@ -77,7 +91,8 @@ class TestSessionRoutes:
             assert data["provider"] is not None
 
     @pytest.mark.skip(reason="Integration test - requires LLM provider configuration")
-    def test_create_session_with_provider(self, client):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_create_session_with_provider(self, client):
         """Test creating a session with specific provider."""
         with patch(
             "donkit_ragops.web.session.manager.get_provider"
@@ -86,7 +101,7 @@ class TestSessionRoutes:
         ) as mock_mcp:
             mock_provider.return_value = MagicMock()
 
-            response = client.post(
+            response = await client.post(
                 "/api/v1/sessions",
                 json={"provider": "openai", "model": "gpt-4"},
             )
@@ -95,14 +110,16 @@ class TestSessionRoutes:
             data = response.json()
             assert data["provider"] == "openai"
 
-    def test_get_session_not_found(self, client):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_get_session_not_found(self, client):
         """Test getting a non-existent session returns 404."""
-        response = client.get("/api/v1/sessions/nonexistent-id")
+        response = await client.get("/api/v1/sessions/nonexistent-id")
 
         assert response.status_code == 404
 
-    def test_delete_session_not_found(self, client):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_delete_session_not_found(self, client):
         """Test deleting a non-existent session returns 404."""
-        response = client.delete("/api/v1/sessions/nonexistent-id")
+        response = await client.delete("/api/v1/sessions/nonexistent-id")
 
         assert response.status_code == 404
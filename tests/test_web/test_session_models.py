@@ -1,12 +1,19 @@
 """Tests for session models."""
 
-import time
+import dataclasses
+import types
 
 import pytest
 
 from donkit_ragops.web.session.models import SessionInfo, WebSession
 
 
+@pytest.fixture(scope="module")
+def sample_session():
+    """Session shared by the read-only tests; tests that mutate build their own."""
+    return WebSession(id="test-123", provider_name="openai", model="gpt-4")
+
+
 def test_web_session_creation():
     """Test WebSession can be created with minimal args."""
     session = WebSession(id="test-123", provider_name="openai")
@@ -22,40 +29,48 @@ def test_web_session_creation():
     assert session.is_connected is False
 
 
-def test_web_session_touch():
+def _freeze_clock(monkeypatch, now: float):
+    """Make the models module see a fixed time.time(); returns a function that advances it."""
+    clock = types.SimpleNamespace(time=lambda: now)
+    monkeypatch.setattr("donkit_ragops.web.session.models.time", clock)
+
+    def advance(seconds: float) -> None:
+        current = clock.time() + seconds
+        clock.time = lambda: current
+
+    return advance
+
+
+def test_web_session_touch(monkeypatch):
     """Test touch updates last_activity."""
     session = WebSession(id="test-123", provider_name="openai")
     original_time = session.last_activity
+    advance = _freeze_clock(monkeypatch, original_time)
 
-    time.sleep(0.01)
+    advance(1)
     session.touch()
 
-    assert session.last_activity > original_time
+    assert session.last_activity == original_time + 1
 
 
-def test_web_session_is_expired():
+def test_web_session_is_expired(monkeypatch):
     """Test is_expired correctly detects expiration."""
     session = WebSession(id="test-123", provider_name="openai")
+    advance = _freeze_clock(monkeypatch, session.last_activity)
 
     # Not expired with 1 hour TTL
     assert session.is_expired(3600) is False
 
-    # Manually set last_activity to past
-    session.last_activity = time.time() - 7200  # 2 hours ago
+    # Two hours pass without activity
+    advance(7200)
 
     # Now should be expired with 1 hour TTL
     assert session.is_expired(3600) is True
 
 
-def test_session_info_from_session():
+def test_session_info_from_session(sample_session):
     """Test SessionInfo.from_session creates correct info."""
-    session = WebSession(
-        id="test-123",
-        provider_name="openai",
-        model="gpt-4",
-    )
-
-    info = SessionInfo.from_session(session)
+    info = SessionInfo.from_session(sample_session)
 
     assert info.id == "test-123"
     assert info.provider == "openai"
@@ -63,3 +78,11 @@ def test_session_info_from_session():
     assert info.is_connected is False
     assert info.message_count == 0
     assert info.mcp_initialized is False
+
+
+def test_session_info_is_frozen(sample_session):
+    """Test SessionInfo snapshots cannot be modified after creation."""
+    info = SessionInfo.from_session(sample_session)
+
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        info.message_count = 5
@@ -1,7 +1,7 @@
 """Tests for WebSocketUI adapter."""
 
 import asyncio
-from unittest.mock import AsyncMock, MagicMock
+from unittest.mock import AsyncMock
 
 import pytest
 
@@ -13,6 +13,23 @@ from donkit_ragops.web.adapters.websocket_ui import (
 )
 
 
+def _message_recorder(expected: int):
+    """Build a send function that records messages.
+
+    Returns:
+        Tuple of (messages, done, send); done is set once `expected` messages arrived.
+    """
+    messages = []
+    done = asyncio.Event()
+
+    async def send(msg):
+        messages.append(msg)
+        if len(messages) >= expected:
+            done.set()
+
+    return messages, done, send
+
+
 class TestWebSpinner:
     """Tests for WebSpinner."""
 
@@ -27,16 +44,12 @@ class TestWebSpinner:
     @pytest.mark.asyncio
     async def test_spinner_start_sends_message(self):
         """Test start sends spinner_start message."""
-        messages = []
-
-        async def capture(msg):
-            messages.append(msg)
+        messages, sent, capture = _message_recorder(expected=1)
 
         spinner = WebSpinner(capture, "Loading...")
         spinner.start()
 
-        # Allow the async task to run
-        await asyncio.sleep(0.01)
+        await asyncio.wait_for(sent.wait(), timeout=1.0)
 
         assert len(messages) == 1
         assert messages[0]["type"] == "spinner_start"
@@ -45,19 +58,16 @@ class TestWebSpinner:
     @pytest.mark.asyncio
     async def test_spinner_context_manager(self):
         """Test spinner can be used as context manager."""
-        messages = []
-
-        async def capture(msg):
-            messages.append(msg)
+        messages, sent, capture = _message_recorder(expected=2)
 
         spinner = WebSpinner(capture, "Loading...")
 
         with spinner:
             assert spinner._running is True
-            # Let the async task run
-            await asyncio.sleep(0.01)
 
         assert spinner._running is False
+        await asyncio.wait_for(sent.wait(), timeout=1.0)
+        assert [m["type"] for m in messages] == ["spinner_start", "spinner_stop"]
 
 
 class TestWebProgressBar:
@@ -75,19 +85,16 @@ class TestWebProgressBar:
     @pytest.mark.asyncio
     async def test_progress_bar_context_manager(self):
         """Test progress bar can be used as context manager."""
-        messages = []
-
-        async def capture(msg):
-            messages.append(msg)
+        messages, sent, capture = _message_recorder(expected=2)
 
         progress = WebProgressBar(capture, 100, "Processing")
 
         with progress:
             assert progress._running is True
-            # Let the async task run
-            await asyncio.sleep(0.01)
 
         assert progress._running is False
+        await asyncio.wait_for(sent.wait(), timeout=1.0)
+        assert [m["type"] for m in messages] == ["progress_start", "progress_stop"]
 
 
 class TestWebSocketUI: